@@ -0,0 +1,144 @@
+"""
+Write-behind buffer for append-only rows (audit logs, notifications)
+
+Rows are queued in memory per table and written with one bulk insert per
+table by a background thread, whenever AUDIT_FLUSH_ROWS rows are waiting
+or AUDIT_FLUSH_SECONDS have passed. add() never touches the database, so
+it is safe to call from async handlers. The buffer never holds more than
+AUDIT_MAX_BUFFERED rows: past that new rows are dropped (and counted)
+until the flusher catches up, so a slow database can't grow memory.
+close() drains everything that is still queued.
+
+When a bulk insert fails its rows are retried one by one, so a single bad
+row (a foreign key violation, say) can't hold back the rest of its table.
+Rows that fail on their own are retried on later flushes; after
+AUDIT_MAX_ATTEMPTS failed attempts a row is dead-lettered: logged in full
+and dropped.
+"""
+import os
+import threading
+import time
+
+import metrics
+
+AUDIT_FLUSH_ROWS = int(os.environ.get("AUDIT_FLUSH_ROWS", "100"))
+AUDIT_FLUSH_SECONDS = float(os.environ.get("AUDIT_FLUSH_SECONDS", "1.0"))
+AUDIT_MAX_BUFFERED = int(os.environ.get("AUDIT_MAX_BUFFERED", "10000"))
+AUDIT_MAX_ATTEMPTS = int(os.environ.get("AUDIT_MAX_ATTEMPTS", "5"))
+# Failed individual inserts, with none succeeding, after which a batch is taken to have hit an outage
+OUTAGE_FAILURES = 3
+
+rows_written = metrics.counter("buffered_rows_written_total", "Rows written by the write-behind buffer")
+rows_dropped = metrics.counter("buffered_rows_dropped_total",
+                               "Rows dropped by the write-behind buffer (buffer full, or dead-lettered)")
+flush_seconds = metrics.histogram("buffered_flush_seconds", "Duration of one bulk insert")
+
+
+class WriteBehindBuffer:
+    def __init__(self, insert_rows, flush_rows: int = AUDIT_FLUSH_ROWS, flush_seconds: float = AUDIT_FLUSH_SECONDS,
+                 max_buffered: int = AUDIT_MAX_BUFFERED, max_attempts: int = AUDIT_MAX_ATTEMPTS):
+        """`insert_rows(table, rows)` performs one bulk insert"""
+        self.insert_rows = insert_rows
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_buffered = max_buffered
+        self.max_attempts = max_attempts
+        self._rows = {}  # table -> list of (row, failed attempts)
+        self._count = 0
+        self._overflow = {}  # table -> rows dropped because the buffer was full, reported by the next flush
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def add(self, table: str, row: dict):
+        with self._lock:
+            full = self._count >= self.max_buffered
+            if full:
+                self._overflow[table] = self._overflow.get(table, 0) + 1
+            else:
+                self._rows.setdefault(table, []).append((row, 0))
+                self._count += 1
+            count = self._count
+        if full:
+            rows_dropped.inc(table=table)
+        if self._thread is None:
+            self.start()
+        if count >= self.flush_rows:
+            self._wake.set()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-behind-buffer", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 10.0):
+        """Stop the background thread and write out everything still queued"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def pending(self) -> int:
+        return self._count
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batches, self._rows, self._count = self._rows, {}, 0
+                overflow, self._overflow = self._overflow, {}
+            for table, dropped in overflow.items():
+                print(f"⚠️ Write-behind buffer full: dropped {dropped} rows for {table}")
+            for table, entries in batches.items():
+                started = time.perf_counter()
+                try:
+                    self.insert_rows(table, [row for row, _ in entries])
+                    rows_written.inc(len(entries), table=table)
+                except Exception as e:
+                    print(f"Error writing {len(entries)} buffered rows to {table}: {e} - retrying row by row")
+                    self._insert_one_by_one(table, entries)
+                flush_seconds.observe(time.perf_counter() - started, table=table)
+
+    def _insert_one_by_one(self, table: str, entries: list):
+        """Write what can be written; requeue the failures, dead-letter rows out of attempts"""
+        failed, written = [], 0
+        for i, (row, attempts) in enumerate(entries):
+            if not written and i >= OUTAGE_FAILURES:
+                # Nothing gets through: the table is unavailable, not the rows bad. Requeue the batch as it was
+                self._requeue(table, entries)
+                return
+            try:
+                self.insert_rows(table, [row])
+                written += 1
+            except Exception as e:
+                if attempts + 1 >= self.max_attempts:
+                    rows_dropped.inc(table=table)
+                    print(f"Error: dead-lettered {table} row after {attempts + 1} attempts ({e}): {row}")
+                else:
+                    failed.append((row, attempts + 1))
+        if written:
+            rows_written.inc(written, table=table)
+        self._requeue(table, failed)
+
+    def _requeue(self, table: str, entries: list):
+        with self._lock:
+            room = self.max_buffered - self._count
+            if room < len(entries):
+                rows_dropped.inc(len(entries) - max(room, 0), table=table)
+                entries = entries[:max(room, 0)]
+            if entries:
+                self._rows[table] = entries + self._rows.get(table, [])
+                self._count += len(entries)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if self._count:
+                self.flush()
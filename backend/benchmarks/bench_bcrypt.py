@@ -0,0 +1,34 @@
+"""
+Benchmark: bcrypt verify time per cost factor on this host
+
+    python benchmarks/bench_bcrypt.py                 # costs 10-14
+    python benchmarks/bench_bcrypt.py --min 8 --max 15 --samples 5
+
+Use the output to choose PASSWORD_BCRYPT_ROUNDS or PASSWORD_VERIFY_TARGET_MS.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from password_hashing import measure_verify, password_policy  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min", type=int, default=10)
+    parser.add_argument("--max", type=int, default=14)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    print(f"{'cost':>4}  {'verify ms':>10}  {'logins/s/core':>13}  {'logins/s (' + str(cores) + ' cores)':>20}")
+    for rounds in range(args.min, args.max + 1):
+        seconds = measure_verify(rounds, args.samples)
+        marker = "  <- current policy" if rounds == password_policy.rounds else ""
+        print(f"{rounds:>4}  {seconds * 1000:>10.1f}  {1 / seconds:>13.1f}  {cores / seconds:>20.1f}{marker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: counting rows server-side vs fetching them and calling len()
+
+Runs in-process on the in-memory backend (no server needed). Seeds the
+demo dataset at --scale, adds --hot-enrollments enrollments to one course,
+then compares per-course lesson/enrollment counts, the single hot-course
+count and the admin user listing's enrollment counts each way. "rows" and "payload" are what the database would have
+sent back; --latency-ms adds a simulated round trip per query.
+
+    python benchmarks/bench_counting.py --scale 10 --hot-enrollments 50000 --latency-ms 2
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import MemoryBackend, Repositories  # noqa: E402
+from data.seed import seed_demo_data  # noqa: E402
+
+
+class Recorder:
+    """Backend proxy that totals queries, rows and JSON payload bytes"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.reset()
+
+    def reset(self):
+        self.queries = self.rows = self.payload = 0
+
+    def table(self, name):
+        query = self.backend.table(name)
+        query.backend = self
+        return query
+
+    def rpc(self, name, params=None):
+        call = self.backend.rpc(name, params)
+        call.backend = self
+        return call
+
+    def run(self, query):
+        result = self.backend.run(query)
+        self.queries += 1
+        self.rows += len(result.data)
+        self.payload += len(json.dumps(result.data)) + (len(str(result.count)) if result.count is not None else 0)
+        return result
+
+
+def measure(label: str, recorder: Recorder, fn):
+    recorder.reset()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<44} {recorder.queries:>6} queries {recorder.rows:>8} rows "
+          f"{recorder.payload / 1024:>10.1f} KiB {elapsed * 1000:>9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--hot-enrollments", type=int, default=50000)
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    backend = MemoryBackend()
+    print(f"Seeded: {seed_demo_data(backend, scale=args.scale)}")
+    backend.table("enrollments").insert([
+        {"user_id": 1_000_000 + i, "course_id": 1, "progress_percentage": 0} for i in range(args.hot_enrollments)
+    ]).execute()
+    print(f"Added {args.hot_enrollments} enrollments to course 1\n")
+    backend.latency = args.latency_ms / 1000
+
+    recorder = Recorder(backend)
+    repo = Repositories(recorder)
+    course_ids = [c["id"] for c in repo.courses.list_all("id")]
+
+    def per_course_len():
+        for course_id in course_ids:
+            len(repo.lessons.list_for_course(course_id, "id"))
+            len(repo.enrollments.list_for_course(course_id, "id"))
+
+    print(f"Lesson + enrollment counts for {len(course_ids)} courses")
+    measure("  fetch ids + len() per course", recorder, per_course_len)
+    measure("  stored counters on courses", recorder, lambda: repo.courses.list_all("id, lesson_count, enrollment_count"))
+
+    print("\nEnrollments of the hot course")
+    measure("  fetch ids + len()", recorder, lambda: len(repo.enrollments.list_for_course(1, "id")))
+    measure("  count(exact, head)", recorder, lambda: repo.enrollments.count(course_id=1))
+
+    learner_ids = [u["id"] for u in repo.users.list("id", role="learner")]
+    print(f"\nAdmin user listing with enrollment counts ({len(learner_ids)} learners)")
+    measure("  fetch ids + len() per learner", recorder,
+            lambda: [len(repo.enrollments.list_for_user(user_id, "id")) for user_id in learner_ids])
+    measure("  user_summaries view", recorder, lambda: repo.users.list_summaries("id, enrollment_count"))
+
+
+if __name__ == "__main__":
+    main()
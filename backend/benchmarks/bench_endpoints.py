@@ -0,0 +1,50 @@
+"""
+Benchmark: throughput of the hot learner/catalog endpoints
+
+Start the backend on the offline data backend, optionally with a simulated
+database round trip so blocking vs awaiting the database shows up:
+
+    DATA_BACKEND=memory MEMORY_LATENCY_MS=5 uvicorn main_new:app --port 8000
+
+    python benchmarks/bench_endpoints.py --label after
+
+Run it once against the previous revision and once against the current
+one (same flags) to get the before/after numbers.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadgen import BASE_URL, login, print_stats, run_load  # noqa: E402
+
+ENDPOINTS = [
+    "/api/auth/me",
+    "/api/courses",
+    "/api/learner/courses",
+    "/api/learner/my-courses",
+    "/api/learner/courses/1",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--email", default="learner@test.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--label", default="")
+    parser.add_argument("endpoints", nargs="*", default=ENDPOINTS)
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.email, args.password)
+    headers = {"Cookie": f"session_token={token}"}
+    for path in args.endpoints:
+        stats = run_load(f"{args.base_url}{path}", args.seconds, args.concurrency, headers=headers)
+        print_stats(f"{args.label} GET {path}".strip(), stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: card projections vs select("*") for catalog responses
+
+Runs in-process on the in-memory backend (no server needed). Seeds the
+demo dataset at --scale and builds the catalog / admin course lists and a
+course page's lesson list both ways, then times serializing them the way
+FastAPI's JSONResponse does (jsonable_encoder + json.dumps). "body" is the
+response size before compression.
+
+    python benchmarks/bench_projections.py --scale 10
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from data import MemoryBackend, Repositories  # noqa: E402
+from data.seed import seed_demo_data  # noqa: E402
+from projections import COURSE_ADMIN_CARD, COURSE_CARD, LESSON_OUTLINE  # noqa: E402
+
+
+def measure(label: str, fetch, repeat: int):
+    rows = fetch()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = json.dumps(jsonable_encoder({"items": rows}), ensure_ascii=False, separators=(",", ":")).encode()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<44} {len(rows):>6} rows {len(body) / 1024:>10.1f} KiB body {elapsed * 1000:>9.2f} ms to serialize")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    backend = MemoryBackend()
+    print(f"Seeded: {seed_demo_data(backend, scale=args.scale)}\n")
+    repo = Repositories(backend)
+    card, admin_card, outline = ", ".join(COURSE_CARD), ", ".join(COURSE_ADMIN_CARD), ", ".join(LESSON_OUTLINE)
+
+    print("GET /api/courses, /api/learner/courses")
+    measure("  select *", lambda: repo.courses.list_published("*, users(full_name)"), args.repeat)
+    measure("  course card", lambda: repo.courses.list_published(card + ", users(full_name)"), args.repeat)
+
+    print("\nGET /api/admin/courses/all")
+    measure("  select *", lambda: repo.courses.list_all("*, users(full_name, email)"), args.repeat)
+    measure("  admin card", lambda: repo.courses.list_all(admin_card + ", users(full_name, email)"), args.repeat)
+
+    print("\nGET /api/learner/courses/1 lessons")
+    measure("  select *", lambda: repo.lessons.list_for_course(1), args.repeat * 10)
+    measure("  lesson outline", lambda: repo.lessons.list_for_course(1, outline), args.repeat * 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: JSON encode time and bytes on the wire for the large listings
+
+Runs in-process on the in-memory backend (no server needed), seeded at
+--scale. For each endpoint it takes the real response payload and times
+encoding it with FastAPI's default path (jsonable_encoder + json.dumps)
+against responses.dumps (orjson), then fetches the endpoint with each
+Accept-Encoding and reports the Content-Length that went out.
+
+    python benchmarks/bench_responses.py --scale 10
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENDPOINTS = [
+    ("admin@test.com", "/api/admin/users/all"),
+    ("admin@test.com", "/api/admin/courses/all"),
+    ("learner@test.com", "/api/learner/courses"),
+]
+
+
+def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ.update(DATA_BACKEND="memory", MEMORY_SEED_SCALE=str(args.scale),
+                      SESSION_SWEEP_INTERVAL="0", COUNTER_RECONCILE_INTERVAL="0")
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.testclient import TestClient
+
+    import main_new
+    import responses
+
+    encodings = ["identity", "gzip"] + (["br"] if responses.brotli is not None else [])
+    with TestClient(main_new.app) as client:
+        for email, path in ENDPOINTS:
+            client.post("/api/auth/login", json={"email": email, "password": "password123"})
+            payload = client.get(path, headers={"Accept-Encoding": "identity"}).json()
+
+            stdlib = timed(lambda: json.dumps(jsonable_encoder(payload)).encode(), args.repeat)
+            fast = timed(lambda: responses.dumps(payload), args.repeat)
+            print(f"GET {path}")
+            print(f"  encode  jsonable_encoder + json {stdlib:>9.2f} ms   orjson {fast:>8.2f} ms   ({stdlib / fast:.1f}x)")
+
+            sizes = []
+            for encoding in encodings:
+                response = client.get(path, headers={"Accept-Encoding": encoding})
+                sizes.append(f"{encoding} {int(response.headers['content-length']) / 1024:.1f} KiB")
+            print(f"  wire    {'   '.join(sizes)}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: session resolution cost (database lookup vs signed tokens)
+
+Start the backend once per mode and run this script against it:
+
+    SESSION_TOKEN_MODE=db     uvicorn main_new:app --port 8000
+    SESSION_TOKEN_MODE=signed SESSION_SIGNING_KEY=... uvicorn main_new:app --port 8000
+
+    python benchmarks/bench_sessions.py --email learner@test.com --password password123
+
+The script also reports how many signed tokens one core verifies per second.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadgen import BASE_URL, login, print_stats, run_load  # noqa: E402
+
+
+def verify_rate(iterations: int = 200000) -> float:
+    os.environ.setdefault("SESSION_SIGNING_KEY", "benchmark-key")
+    import session_tokens
+
+    token = session_tokens.issue_token({"id": 1, "email": "a@b.c", "full_name": "Bench", "role": "learner"})
+    started = time.perf_counter()
+    for _ in range(iterations):
+        session_tokens.decode_token(token)
+    return iterations / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"🔐 Signed token verification: {verify_rate():,.0f} tokens/s on one core")
+
+    token = login(args.base_url, args.email, args.password)
+    mode = "signed" if "." in token else "db"
+    stats = run_load(f"{args.base_url}/api/auth/me", args.seconds, args.concurrency,
+                     headers={"Cookie": f"session_token={token}"})
+    print_stats(f"GET /api/auth/me ({mode} session)", stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Minimal HTTP load generator shared by the LearnSphere benchmarks
+"""
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = "http://localhost:8000"
+
+
+def login(base_url: str, email: str, password: str) -> str:
+    """Log in and return the session cookie value"""
+    req = urllib.request.Request(
+        f"{base_url}/api/auth/login",
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req) as resp:
+        for header in resp.headers.get_all("set-cookie") or []:
+            name, _, rest = header.partition("=")
+            if name.strip() == "session_token":
+                return rest.split(";", 1)[0]
+    raise RuntimeError("Login succeeded but no session_token cookie was set")
+
+
+def run_load(url: str, seconds: float = 10, concurrency: int = 16, headers: dict = None) -> dict:
+    """Hit `url` from `concurrency` threads for `seconds` and summarise"""
+    headers = headers or {}
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        latencies, errors, size = [], 0, 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as resp:
+                    size += len(resp.read())
+            except (urllib.error.URLError, ConnectionError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+        return latencies, errors, size
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(l for r in results for l in r[0])
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": sum(r[1] for r in results),
+        "rps": count / elapsed if elapsed else 0.0,
+        "p50_ms": latencies[count // 2] * 1000 if count else 0.0,
+        "p95_ms": latencies[int(count * 0.95)] * 1000 if count else 0.0,
+        "bytes_per_request": sum(r[2] for r in results) / count if count else 0,
+    }
+
+
+def print_stats(label: str, stats: dict):
+    print(f"{label:<40} {stats['rps']:>9.1f} req/s   p50 {stats['p50_ms']:>7.2f} ms   "
+          f"p95 {stats['p95_ms']:>7.2f} ms   errors {stats['errors']}")
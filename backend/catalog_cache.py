@@ -0,0 +1,45 @@
+"""
+Catalog cache for LearnSphere - versioned, pre-serialized snapshots of the published catalog
+
+/api/courses and /api/learner/courses serve the same few catalog variants
+to everyone, so each variant is built once - rows plus the rendered JSON
+body and its ETag - and reused until the catalog changes. Every course
+mutation (create/update/delete, publish toggles, lesson changes that move
+the card's counters, rating updates) calls invalidate(), which bumps the
+version and drops all snapshots. A build that started before an
+invalidation is not stored, so a stale catalog can't be put back after the
+write that replaced it; concurrent misses share one build (read_cache).
+
+The cache is per process: other workers see a write when their own
+snapshots go stale after CATALOG_CACHE_TTL seconds. For CATALOG_STALE_TTL
+seconds after that the old snapshot is still served while one rebuild runs.
+"""
+import os
+from dataclasses import dataclass
+
+from read_cache import ReadCache
+from responses import etag_for
+
+CATALOG_CACHE_TTL = int(os.environ.get("CATALOG_CACHE_TTL", "300"))
+CATALOG_STALE_TTL = int(os.environ.get("CATALOG_STALE_TTL", "60"))
+
+
+@dataclass
+class Snapshot:
+    version: int
+    content: dict
+    body: bytes
+    etag: str
+
+
+class CatalogCache(ReadCache):
+    @property
+    def version(self) -> int:
+        """Catalog version: the number of invalidations so far, plus one"""
+        return self._generation + 1
+
+    def snapshot(self, version: int, content: dict, body: bytes) -> Snapshot:
+        return Snapshot(version, content, body, etag_for(body))
+
+
+catalog_cache = CatalogCache("catalog", CATALOG_CACHE_TTL, CATALOG_STALE_TTL, max_entries=16)
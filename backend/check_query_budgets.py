@@ -0,0 +1,117 @@
+"""
+CI check: per-route database query budgets and N+1 detection
+
+Boots the app in-process on the seeded in-memory backend, calls each
+route below as the matching demo user and reads the query count from the
+Server-Timing header. It fails when a route goes over its budget or, in
+N_PLUS_ONE_MODE=raise, repeats a query shape - so a new query-in-a-loop
+cannot land unnoticed.
+
+    python check_query_budgets.py            # from backend/, exit code 1 on failure
+    python check_query_budgets.py --report   # print counts without failing
+
+Routes in KNOWN_N_PLUS_ONE still loop over rows; they keep a budget sized
+for the seeded dataset until they are fixed, then leave the list.
+"""
+import argparse
+import os
+import re
+import sys
+
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["N_PLUS_ONE_MODE"] = "raise"
+os.environ.setdefault("MEMORY_SEED_SCALE", "1")
+os.environ.setdefault("SESSION_SWEEP_INTERVAL", "0")
+os.environ.setdefault("COUNTER_RECONCILE_INTERVAL", "0")
+os.environ.setdefault("AUDIT_FLUSH_SECONDS", "0.05")
+
+# (role, method, path, json body, max queries)
+BUDGETS = [
+    (None, "GET", "/api/courses", None, 1),
+    (None, "GET", "/api/courses/1/reviews", None, 1),
+    (None, "GET", "/api/lessons/1", None, 1),
+    ("learner", "GET", "/api/auth/me", None, 1),
+    ("learner", "GET", "/api/learner/courses", None, 2),
+    ("learner", "GET", "/api/learner/my-courses", None, 2),
+    ("learner", "GET", "/api/learner/courses/1", None, 4),
+    ("learner", "GET", "/api/learner/profile", None, 4),
+    ("learner", "GET", "/api/learner/achievements", None, 8),
+    ("learner", "GET", "/api/learner/dashboard", None, 8),
+    ("learner", "POST", "/api/learner/courses/1/enroll", None, 3),
+    ("learner", "POST", "/api/learner/lessons/1/start", None, 3),
+    ("learner", "POST", "/api/learner/lessons/1/bootstrap", None, 7),
+    ("learner", "POST", "/api/learner/lessons/2/complete", None, 2),
+    ("learner", "POST", "/api/learner/quizzes/1/submit", {"answers": ["A"] * 5}, 7),
+    ("admin", "GET", "/api/admin/users/all", None, 2),
+    ("admin", "GET", "/api/admin/courses/all", None, 2),
+    ("admin", "GET", "/api/admin/instructors", None, 2),
+    ("admin", "GET", "/api/admin/users/3/enrollments", None, 3),
+    ("instructor", "GET", "/api/instructor/courses", None, 2),
+    ("instructor", "GET", "/api/instructor/courses/1", None, 3),
+]
+
+# Existing query-in-a-loop routes: "METHOD /route/template" -> budget on the seeded data
+KNOWN_N_PLUS_ONE = {}
+
+USERS = {
+    "learner": "learner@test.com",
+    "admin": "admin@test.com",
+    "instructor": "instructor@test.com",
+}
+
+QUERY_COUNT = re.compile(r'desc="(\d+) quer')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--report", action="store_true", help="print counts, never fail")
+    args = parser.parse_args()
+
+    from fastapi.testclient import TestClient
+
+    import main_new
+    import query_tracking
+
+    query_tracking.n_plus_one.allowed_routes = set(KNOWN_N_PLUS_ONE)
+    failures = []
+    with TestClient(main_new.app) as client:
+        for role, method, path, body, budget in BUDGETS:
+            client.cookies.clear()
+            if role:
+                login = client.post("/api/auth/login", json={"email": USERS[role], "password": "password123"})
+                if login.status_code != 200:
+                    failures.append(f"login as {role} failed: {login.status_code}")
+                    continue
+
+            route = next((r.path for r in main_new.app.routes
+                          if getattr(r, "path_regex", None) and r.path_regex.match(path)
+                          and method in getattr(r, "methods", ())), path)
+            key = f"{method} {route}"
+            known = key in KNOWN_N_PLUS_ONE
+            limit = KNOWN_N_PLUS_ONE.get(key, budget)
+
+            try:
+                response = client.request(method, path, json=body)
+            except query_tracking.NPlusOneError as e:
+                failures.append(str(e))
+                print(f"❌ {key:<50} N+1")
+                continue
+
+            match = QUERY_COUNT.search(response.headers.get("server-timing", ""))
+            count = int(match.group(1)) if match else -1
+            ok = response.status_code < 400 and 0 <= count <= limit
+            note = " (known N+1)" if known else ""
+            print(f"{'✅' if ok else '❌'} {key:<50} {count:>4} queries  budget {limit}{note}")
+            if response.status_code >= 400:
+                failures.append(f"{key} returned {response.status_code}")
+            elif count > limit:
+                failures.append(f"{key} issued {count} queries, budget {limit}")
+
+    if failures:
+        print("\n" + "\n".join(failures))
+    if failures and not args.report:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
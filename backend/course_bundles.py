@@ -0,0 +1,88 @@
+"""
+Course bundles for LearnSphere - one shared, versioned build of a course's content
+
+The learner course page, the instructor and admin course pages and
+/api/lessons/{id} all need the same course row, instructor and ordered
+lessons. A CourseBundle holds them, built once per (course_id,
+content_version) and shared by every request; handlers layer per-user data
+(enrollment, progress) on top. Every course or lesson write calls
+bump(course_id), which moves the course to a new content_version, so the
+next read builds a fresh bundle and the old one is dropped.
+
+Bundles are shared between requests: treat them as read-only and copy
+before changing anything. Content versions are per process; other workers
+rebuild once their bundle goes stale (COURSE_CACHE_TTL).
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from projections import LESSON_OUTLINE
+from read_cache import ReadCache
+
+COURSE_CACHE_TTL = float(os.environ.get("COURSE_CACHE_TTL", "30"))
+COURSE_STALE_TTL = float(os.environ.get("COURSE_STALE_TTL", "120"))
+
+
+@dataclass(frozen=True)
+class CourseBundle:
+    course_id: int
+    content_version: int
+    course: dict  # the courses row, without the instructor embed
+    instructor_name: Optional[str]
+    instructor_email: Optional[str]
+    lessons: tuple  # full lesson rows by order_index
+    outline: tuple  # the same lessons cut down to LESSON_OUTLINE
+
+    @classmethod
+    def build(cls, course_id: int, content_version: int, course: dict, lessons: list) -> "CourseBundle":
+        course = dict(course)
+        instructor = course.pop('users', None) or {}
+        return cls(course_id, content_version, course, instructor.get('full_name'), instructor.get('email'),
+                   tuple(lessons), tuple({c: lesson.get(c) for c in LESSON_OUTLINE} for lesson in lessons))
+
+    def lesson(self, lesson_id: int) -> Optional[dict]:
+        return next((lesson for lesson in self.lessons if lesson['id'] == lesson_id), None)
+
+
+class CourseBundles:
+    def __init__(self, ttl: float = COURSE_CACHE_TTL, stale_ttl: float = COURSE_STALE_TTL):
+        self._cache = ReadCache("course_bundle", ttl, stale_ttl)
+        self._versions = {}  # course_id -> content_version
+        self._lesson_courses = {}  # lesson_id -> course_id, learned from bundles and lesson reads
+        self._lock = threading.Lock()
+
+    def content_version(self, course_id: int) -> int:
+        return self._versions.get(course_id, 1)
+
+    async def get(self, course_id: int, load) -> Optional[CourseBundle]:
+        """The bundle at the course's current content_version; `load(course_id, version)` builds it (None when
+        the course does not exist)"""
+        version = self.content_version(course_id)
+        bundle = await self._cache.get((course_id, version), lambda: load(course_id, version))
+        if bundle is not None:
+            with self._lock:
+                for lesson in bundle.lessons:
+                    self._lesson_courses[lesson['id']] = course_id
+        return bundle
+
+    def course_of(self, lesson_id: int) -> Optional[int]:
+        """The course a lesson belongs to, if a bundle or lesson read has shown it"""
+        return self._lesson_courses.get(lesson_id)
+
+    def remember(self, lesson_id: int, course_id: int):
+        with self._lock:
+            self._lesson_courses[lesson_id] = course_id
+
+    def bump(self, course_id: int):
+        """The course or one of its lessons changed: new content_version, old bundles dropped, and the
+        course's lessons forgotten by course_of() (a lesson may have moved to another course)"""
+        with self._lock:
+            self._versions[course_id] = self._versions.get(course_id, 1) + 1
+            for lesson_id in [l for l, c in self._lesson_courses.items() if c == course_id]:
+                del self._lesson_courses[lesson_id]
+        self._cache.invalidate(course_id)
+
+
+course_bundles = CourseBundles()
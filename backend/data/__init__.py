@@ -0,0 +1,45 @@
+"""
+LearnSphere data layer
+
+create_backend() returns a client with the supabase-py table() API:
+the Supabase client itself, a direct Postgres backend or an in-memory
+backend. Repositories wraps such a client with one repository per
+aggregate (users, sessions, courses, ...). create_async_backend()
+returns the awaitable counterpart used by the async endpoints, and
+AsyncpgBackend is the optional direct-SQL engine for the hottest paths.
+"""
+from .aio import AsyncBackend, AsyncSupabase
+from .memory import MemoryBackend
+from .pgasync import AsyncpgBackend
+from .query import QueryError
+from .repositories import Repositories
+
+BACKENDS = ("supabase", "postgres", "memory")
+
+
+def create_backend(kind: str = "supabase", supabase_url: str = None, supabase_key: str = None,
+                   database_url: str = None, max_connections: int = 10, memory_latency: float = 0.0):
+    if kind == "supabase":
+        from supabase import create_client
+        return create_client(supabase_url, supabase_key)
+    if kind == "postgres":
+        if not database_url:
+            raise ValueError("DATABASE_URL is required for the postgres data backend")
+        from .postgres import PostgresBackend
+        return PostgresBackend(database_url, max_connections=max_connections)
+    if kind == "memory":
+        return MemoryBackend(latency=memory_latency)
+    raise ValueError(f"Unknown data backend {kind!r}, expected one of {', '.join(BACKENDS)}")
+
+
+def create_async_backend(kind: str, backend, supabase_url: str = None, supabase_key: str = None,
+                         max_concurrency: int = 10):
+    """Async client over the same data as `backend` (the create_backend() result)"""
+    if kind == "supabase":
+        return AsyncSupabase(supabase_url, supabase_key, max_concurrency=max_concurrency)
+    if kind in ("postgres", "memory"):
+        return AsyncBackend(backend, max_concurrency=max_concurrency, inline=kind == "memory")
+    raise ValueError(f"Unknown data backend {kind!r}, expected one of {', '.join(BACKENDS)}")
+
+
+__all__ = ["AsyncpgBackend", "BACKENDS", "MemoryBackend", "QueryError", "Repositories", "create_async_backend", "create_backend"]
@@ -0,0 +1,107 @@
+"""
+Async clients for the LearnSphere data layer
+
+Both clients expose the same table().select().eq()... chain as the sync
+backends, but execute() is a coroutine. Every query holds one of
+`max_concurrency` slots while it runs, so in-flight database work is
+bounded by the connection budget rather than by the threadpool size.
+
+- AsyncSupabase wraps supabase-py's AsyncClient (PostgREST over httpx).
+- AsyncBackend adapts the memory backend (executed inline, it never
+  blocks on I/O) and the psycopg2 backend (executed in a worker thread).
+"""
+import asyncio
+
+from .query import Query, Result, Rpc
+
+
+class AsyncQuery(Query):
+    async def execute(self) -> Result:
+        return await self.backend.run_async(self)
+
+
+class AsyncRpc(Rpc):
+    async def execute(self) -> Result:
+        return await self.backend.run_async(self)
+
+
+class AsyncBackend:
+    is_async = True
+
+    def __init__(self, backend, max_concurrency: int = 10, inline: bool = False):
+        self.backend = backend
+        self.inline = inline
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def table(self, name: str) -> AsyncQuery:
+        return AsyncQuery(self, name)
+
+    def rpc(self, name: str, params: dict = None) -> AsyncRpc:
+        return AsyncRpc(self, name, params)
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def run_async(self, query: Query) -> Result:
+        async with self._slots:
+            if self.inline:
+                if self.backend.latency:
+                    await asyncio.sleep(self.backend.latency)
+                return self.backend.apply(query)
+            return await asyncio.to_thread(self.backend.run, query)
+
+
+class _BoundedBuilder:
+    """Proxy for a postgrest async request builder that awaits a slot in execute()"""
+
+    def __init__(self, builder, slots: asyncio.Semaphore):
+        self._builder = builder
+        self._slots = slots
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            return _BoundedBuilder(attr(*args, **kwargs), self._slots)
+        return call
+
+    async def execute(self):
+        async with self._slots:
+            return await self._builder.execute()
+
+
+class AsyncSupabase:
+    is_async = True
+
+    def __init__(self, url: str, key: str, max_concurrency: int = 10):
+        self.url = url
+        self.key = key
+        self.max_concurrency = max_concurrency
+        self.client = None
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def connect(self):
+        if self.client is None:
+            from supabase import acreate_client
+            self.client = await acreate_client(self.url, self.key)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.postgrest.aclose()
+            self.client = None
+
+    def table(self, name: str) -> _BoundedBuilder:
+        if self.client is None:
+            raise RuntimeError("AsyncSupabase.connect() must be awaited before use")
+        return _BoundedBuilder(self.client.table(name), self._slots)
+
+    def rpc(self, name: str, params: dict = None) -> _BoundedBuilder:
+        if self.client is None:
+            raise RuntimeError("AsyncSupabase.connect() must be awaited before use")
+        return _BoundedBuilder(self.client.rpc(name, params or {}), self._slots)
@@ -0,0 +1,445 @@
+"""
+In-memory backend - the whole API without a network or a database
+
+Tables are dicts of id -> row guarded by a single lock. Column defaults,
+unique keys and ON DELETE CASCADE rules mirror the SQL migrations closely
+enough for load testing and for measuring the app's own overhead.
+`latency` (seconds) adds a simulated database round trip to every query.
+SQL views are computed on read by a `_view_<name>` method.
+"""
+import copy
+import fnmatch
+import threading
+import time
+from datetime import datetime, timezone
+
+from .query import Query, QueryError, Result, Rpc, embed_column
+
+NOW = object()  # default placeholder: current timestamp
+
+COLUMN_DEFAULTS = {
+    "users": {"role": "learner", "is_approved": False, "created_at": NOW},
+    "sessions": {"created_at": NOW},
+    "courses": {
+        "subject_name": "", "tagline": "", "short_description": "", "full_description": "",
+        "image_url": "", "video_url": "", "audio_url": "", "tags": "", "visibility": "public",
+        "access": "free", "price": 0, "published": False, "average_rating": 0.0, "total_reviews": 0,
+        "lesson_count": 0, "enrollment_count": 0, "completion_count": 0, "total_duration": 0, "created_at": NOW,
+    },
+    "lessons": {
+        "description": "", "content": "", "video_url": "", "audio_url": "", "image_url": "",
+        "duration": 0, "order_index": 0, "lesson_type": "video", "created_at": NOW,
+    },
+    "enrollments": {
+        "progress_percentage": 0, "status": "active", "is_paid": False, "completion_date": None,
+        "enrolled_at": NOW, "created_at": NOW,
+    },
+    "lesson_progress": {
+        "status": "not_started", "is_completed": False, "completed_at": None, "last_position": 0,
+        "created_at": NOW,
+    },
+    "quizzes": {"questions": [], "attempt_rewards": {}, "created_at": NOW},
+    "quiz_attempts": {"created_at": NOW},
+    "user_points": {"points": 0, "total_points": 0, "created_at": NOW},
+    "notifications": {"is_read": False, "created_at": NOW},
+    "user_badges": {"is_new": True, "earned_date": NOW},
+    "certificates": {"is_downloaded": False, "issued_date": NOW},
+    "course_reviews": {"created_at": NOW},
+    "admin_messages": {"is_completed": False, "created_at": NOW},
+    "instructor_messages": {"is_read": False, "created_at": NOW},
+    "achievements": {"achieved_date": NOW},
+}
+
+UNIQUE_KEYS = {
+    "users": [("email",)],
+    "sessions": [("token",)],
+    "enrollments": [("user_id", "course_id")],
+    "lesson_progress": [("user_id", "lesson_id")],
+    "course_reviews": [("user_id", "course_id")],
+}
+
+# Equality lookups on these columns use a hash index instead of a scan
+INDEXED_COLUMNS = ("user_id", "course_id", "lesson_id", "instructor_id", "quiz_id", "token", "email")
+
+# parent table -> [(child table, foreign key column)]
+CASCADES = {
+    "users": [
+        ("sessions", "user_id"), ("courses", "instructor_id"), ("enrollments", "user_id"),
+        ("lesson_progress", "user_id"), ("user_points", "user_id"), ("notifications", "user_id"),
+        ("user_badges", "user_id"), ("certificates", "user_id"), ("course_reviews", "user_id"),
+        ("quiz_attempts", "user_id"), ("achievements", "user_id"),
+    ],
+    "courses": [
+        ("lessons", "course_id"), ("enrollments", "course_id"), ("lesson_progress", "course_id"),
+        ("quizzes", "course_id"), ("certificates", "course_id"), ("course_reviews", "course_id"),
+    ],
+    "lessons": [("lesson_progress", "lesson_id"), ("lesson_attachments", "lesson_id"), ("quizzes", "lesson_id")],
+    "quizzes": [("quiz_attempts", "quiz_id")],
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _first(rows: list):
+    return rows[0] if rows else None
+
+
+def _copy(row: dict) -> dict:
+    return {k: copy.deepcopy(v) if isinstance(v, (list, dict)) else v for k, v in row.items()}
+
+
+def _coerce(actual, value):
+    """Logic-tree values arrive as text (see query.parse_logic); compare them as the column's type"""
+    if isinstance(value, str) and isinstance(actual, (int, float)) and not isinstance(actual, bool):
+        try:
+            return type(actual)(value)
+        except ValueError:
+            return value
+    if isinstance(value, list):
+        return [_coerce(actual, v) for v in value]
+    return value
+
+
+def _matches(row: dict, filters) -> bool:
+    for column, op, value in filters:
+        if op in ("and", "or"):
+            results = (_matches(row, [child]) for child in value)
+            if not (all(results) if op == "and" else any(results)):
+                return False
+            continue
+        if op == "not":
+            if _matches(row, value):
+                return False
+            continue
+        actual = row.get(column)
+        value = _coerce(actual, value)
+        if op == "eq":
+            ok = actual == value
+        elif op == "neq":
+            ok = actual != value
+        elif op == "in":
+            ok = actual in value
+        elif op == "is":
+            ok = actual is value if value is None or isinstance(value, bool) else actual == value
+        elif op == "ilike":
+            ok = actual is not None and fnmatch.fnmatch(str(actual).lower(), value.lower().replace("%", "*"))
+        elif actual is None:
+            ok = False
+        elif op == "gt":
+            ok = actual > value
+        elif op == "gte":
+            ok = actual >= value
+        elif op == "lt":
+            ok = actual < value
+        else:
+            ok = actual <= value
+        if not ok:
+            return False
+    return True
+
+# Trigger-maintained counters (migrations/005_course_counters.sql, 011_course_counter_triggers.sql):
+# child table -> (parent table, foreign key column, {parent column: row -> contribution})
+COUNTERS = {
+    "lessons": ("courses", "course_id", {
+        "lesson_count": lambda row: 1,
+        "total_duration": lambda row: row.get("duration") or 0,
+    }),
+    "enrollments": ("courses", "course_id", {
+        "enrollment_count": lambda row: 1,
+        "completion_count": lambda row: int(row.get("status") == "completed"),
+    }),
+}
+
+
+class MemoryBackend:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables = {}  # table -> {id: row}
+        self._next_id = {}
+        self._unique = {}  # (table, columns) -> {key: id}
+        self._by_column = {}  # (table, column) -> {value: set of ids}
+        self._lock = threading.RLock()
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, name: str, params: dict = None) -> Rpc:
+        return Rpc(self, name, params)
+
+    def run(self, query: Query) -> Result:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.apply(query)
+
+    def apply(self, query: Query) -> Result:
+        """Execute without the simulated latency"""
+        with self._lock:
+            handler = getattr(self, f"_{query.operation}")
+            return handler(query)
+
+    def reset(self):
+        with self._lock:
+            self.tables.clear()
+            self._next_id.clear()
+            self._unique.clear()
+            self._by_column.clear()
+
+    # Operations
+
+    def _select(self, query: Query) -> Result:
+        rows = self._find(query)
+        count = len(rows) if query.count_mode else None
+        if query.head:
+            return Result([], count)
+        rows = self._ordered(rows, query.ordering)
+        if query.offset_count:
+            rows = rows[query.offset_count:]
+        if query.limit_count is not None:
+            rows = rows[:query.limit_count]
+        return Result([self._project(query.table, row, query.selection) for row in rows], count)
+
+    def _insert(self, query: Query) -> Result:
+        return Result([self._insert_row(query.table, payload) for payload in query.payload])
+
+    def _upsert(self, query: Query) -> Result:
+        if query.on_conflict not in UNIQUE_KEYS.get(query.table, []):
+            raise QueryError("there is no unique or exclusion constraint matching the ON CONFLICT specification")
+        keys = self._unique.get((query.table, query.on_conflict), {})
+        written = []
+        for payload in query.payload:
+            owner = keys.get(tuple(payload.get(c) for c in query.on_conflict))
+            if owner is None:
+                written.append(self._insert_row(query.table, payload))
+            elif not query.ignore_duplicates:
+                changes = {c: v for c, v in payload.items() if c not in query.on_conflict and c != "id"}
+                written.append(self._update_row(query.table, self.tables[query.table][owner], changes))
+        return Result(written)
+
+    def _update(self, query: Query) -> Result:
+        return Result([self._update_row(query.table, row, query.payload) for row in self._find(query)])
+
+    def _delete(self, query: Query) -> Result:
+        deleted = [_copy(row) for row in self._find(query)]
+        self._delete_ids(query.table, [row["id"] for row in deleted])
+        return Result(deleted)
+
+    def _rpc(self, call: Rpc) -> Result:
+        function = getattr(self, f"_rpc_{call.name}", None)
+        if function is None:
+            raise QueryError(f"function {call.name} does not exist")
+        return Result(function(**call.params))
+
+    # Stored functions (see migrations/)
+
+    def _rpc_reconcile_course_counters(self, p_course_ids: list = None) -> list:
+        """Recompute course counters from lessons/enrollments; return the courses that had drifted"""
+        courses = self.tables.get("courses", {})
+        repaired = []
+        for course_id in (courses if p_course_ids is None else p_course_ids):
+            course = courses.get(course_id)
+            if course is None:
+                continue
+            actual = {}
+            for child, (_, column, counters) in COUNTERS.items():
+                query = Query(self, child)
+                query.filters = [(column, "eq", course_id)]
+                children = self._find(query)
+                for counter, contribution in counters.items():
+                    actual[counter] = sum(contribution(row) for row in children)
+            if any(course.get(counter) != value for counter, value in actual.items()):
+                course.update(actual)
+                repaired.append(dict(course_id=course_id, **actual))
+        return repaired
+
+    def _rpc_trim_user_sessions(self, p_max_per_user: int, p_user_ids: list) -> list:
+        """Delete sessions past each of p_user_ids' newest p_max_per_user; return their tokens"""
+        over_cap = []
+        for user_id in p_user_ids:
+            query = Query(self, "sessions")
+            query.filters = [("user_id", "eq", user_id)]
+            rows = sorted(self._find(query), key=lambda r: (r.get("created_at") or "", r["id"]), reverse=True)
+            over_cap.extend(rows[p_max_per_user:])
+        self._delete_ids("sessions", [row["id"] for row in over_cap])
+        return [{"token": row["token"]} for row in over_cap]
+
+    def _rpc_complete_lesson(self, p_user_id: int, p_lesson_id: int) -> list:
+        """Lesson completion pipeline, atomic under the backend lock (migrations/006_complete_lesson.sql)"""
+        def one(query):
+            return _first(self.apply(query).data)
+
+        lesson = one(self.table("lessons").select("course_id, title").eq("id", p_lesson_id))
+        if lesson is None:
+            return []
+        course_id, now = lesson["course_id"], _now()
+
+        first = not self.apply(self.table("lesson_progress").update(
+            {"status": "completed", "is_completed": True, "completed_at": now}
+        ).eq("user_id", p_user_id).eq("lesson_id", p_lesson_id)).data
+        if first:
+            self.apply(self.table("lesson_progress").insert({
+                "user_id": p_user_id, "course_id": course_id, "lesson_id": p_lesson_id,
+                "status": "completed", "is_completed": True, "completed_at": now}))
+            self.apply(self.table("user_points").insert({
+                "user_id": p_user_id, "points": 10, "reason": f"Completed lesson: {lesson['title']}", "earned_date": now}))
+
+        course = one(self.table("courses").select("lesson_count, title").eq("id", course_id))
+        total = course["lesson_count"] if course else 0
+        if total > 0:
+            done = self.apply(self.table("lesson_progress").select("id", count="exact", head=True).eq(
+                "user_id", p_user_id).eq("course_id", course_id).eq("is_completed", True)).count
+            percentage = done * 100 // total
+            status = "not_started" if percentage == 0 else "completed" if percentage == 100 else "in_progress"
+            self.apply(self.table("enrollments").update({
+                "progress_percentage": percentage, "status": status,
+                "completion_date": now if status == "completed" else None,
+            }).eq("user_id", p_user_id).eq("course_id", course_id))
+
+            if percentage == 100 and one(self.table("certificates").select("id").eq(
+                    "user_id", p_user_id).eq("course_id", course_id)) is None:
+                stamp = int(datetime.now(timezone.utc).timestamp())
+                self.apply(self.table("certificates").insert({
+                    "user_id": p_user_id, "course_id": course_id, "certificate_number": f"CERT-{p_user_id}-{course_id}-{stamp}",
+                    "issued_date": now, "grade": "A"}))
+                badge = one(self.table("badges").select("id").eq("name", "Course Completed").limit(1))
+                if badge and one(self.table("user_badges").select("id").eq("user_id", p_user_id).eq("badge_id", badge["id"])) is None:
+                    self.apply(self.table("user_badges").insert({"user_id": p_user_id, "badge_id": badge["id"], "earned_date": now}))
+                self.apply(self.table("user_points").insert({
+                    "user_id": p_user_id, "points": 100, "reason": f"Completed course: {course['title']}", "earned_date": now}))
+
+        enrollment = one(self.table("enrollments").select("progress_percentage, status").eq(
+            "user_id", p_user_id).eq("course_id", course_id)) or {}
+        certificate = None
+        if enrollment.get("progress_percentage") == 100:
+            certificate = one(self.table("certificates").select("*").eq("user_id", p_user_id).eq("course_id", course_id))
+        return [{"course_id": course_id, "first_completion": first,
+                 "progress_percentage": enrollment.get("progress_percentage"), "status": enrollment.get("status"),
+                 "certificate": certificate}]
+
+    # Views (see migrations/)
+
+    def _view_user_summaries(self) -> dict:
+        """users + enrollment_count and course_count, password hashes left out"""
+        enrollments = self._by_column.get(("enrollments", "user_id"), {})
+        courses = self._by_column.get(("courses", "instructor_id"), {})
+        columns = ("id", "full_name", "email", "role", "is_approved", "created_at")
+        return {
+            user_id: dict({c: user.get(c) for c in columns},
+                          enrollment_count=len(enrollments.get(user_id, ())),
+                          course_count=len(courses.get(user_id, ())))
+            for user_id, user in self.tables.get("users", {}).items()
+        }
+
+    # Helpers
+
+    def _rows(self, name: str) -> dict:
+        view = getattr(self, f"_view_{name}", None)
+        return view() if view else self.tables.get(name, {})
+
+    def _find(self, query: Query) -> list:
+        table = self._rows(query.table)
+        for column, op, value in query.filters:
+            if op != "eq":
+                continue
+            if column == "id":
+                row = table.get(value)
+                return [row] if row is not None and _matches(row, query.filters) else []
+            if column in INDEXED_COLUMNS and query.table in self.tables:
+                ids = sorted(self._by_column.get((query.table, column), {}).get(value, ()))
+                return [table[i] for i in ids if _matches(table[i], query.filters)]
+        return [row for row in table.values() if _matches(row, query.filters)]
+
+    def _ordered(self, rows: list, ordering) -> list:
+        for column, desc in reversed(ordering):
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=desc)
+            # PostgREST default: NULLS LAST ascending, NULLS FIRST descending
+            rows = missing + present if desc else present + missing
+        return rows
+
+    def _project(self, table: str, row: dict, selection) -> dict:
+        if "*" in selection.columns:
+            result = _copy(row)
+        else:
+            result = {c: copy.deepcopy(row.get(c)) for c in selection.columns}
+        for embed in selection.embeds:
+            target_id = row.get(embed_column(table, embed))
+            target = self.tables.get(embed.table, {}).get(target_id)
+            result[embed.table] = self._project(embed.table, target, embed.selection) if target else None
+        return result
+
+    def _with_defaults(self, table: str, payload: dict) -> dict:
+        row = {}
+        for column, default in COLUMN_DEFAULTS.get(table, {"created_at": NOW}).items():
+            row[column] = _now() if default is NOW else copy.deepcopy(default)
+        row.update(_copy(payload))
+        if row.get("id") is None:
+            row["id"] = self._next_id.get(table, 1)
+        self._next_id[table] = max(self._next_id.get(table, 1), row["id"] + 1)
+        return row
+
+    def _insert_row(self, table: str, payload: dict) -> dict:
+        row = self._with_defaults(table, payload)
+        self._check_unique(table, row)
+        self.tables.setdefault(table, {})[row["id"]] = row
+        self._index(table, row)
+        self._count(table, row, 1)
+        return _copy(row)
+
+    def _update_row(self, table: str, row: dict, changes: dict) -> dict:
+        self._check_unique(table, dict(row, **changes), ignore_id=row["id"])
+        self._unindex(table, row)
+        self._count(table, row, -1)
+        row.update(_copy(changes))
+        self._index(table, row)
+        self._count(table, row, 1)
+        return _copy(row)
+
+    def _check_unique(self, table: str, row: dict, ignore_id=None):
+        if row["id"] in self.tables.get(table, {}) and row["id"] != ignore_id:
+            raise QueryError(f'duplicate key value violates unique constraint "{table}_pkey"')
+        for columns in UNIQUE_KEYS.get(table, []):
+            owner = self._unique.get((table, columns), {}).get(tuple(row.get(c) for c in columns))
+            if owner is not None and owner != ignore_id:
+                raise QueryError(f'duplicate key value violates unique constraint on {table}({", ".join(columns)})')
+
+    def _index(self, table: str, row: dict):
+        for columns in UNIQUE_KEYS.get(table, []):
+            self._unique.setdefault((table, columns), {})[tuple(row.get(c) for c in columns)] = row["id"]
+        for column in INDEXED_COLUMNS:
+            if column in row:
+                self._by_column.setdefault((table, column), {}).setdefault(row[column], set()).add(row["id"])
+
+    def _unindex(self, table: str, row: dict):
+        for columns in UNIQUE_KEYS.get(table, []):
+            self._unique.get((table, columns), {}).pop(tuple(row.get(c) for c in columns), None)
+        for column in INDEXED_COLUMNS:
+            if column in row:
+                ids = self._by_column.get((table, column), {}).get(row[column])
+                if ids is not None:
+                    ids.discard(row["id"])
+
+    def _count(self, table: str, row: dict, sign: int):
+        """Apply `row`'s contribution to its parent's counters, like the AFTER triggers"""
+        if table not in COUNTERS:
+            return
+        parent_table, column, counters = COUNTERS[table]
+        parent = self.tables.get(parent_table, {}).get(row.get(column))
+        if parent is not None:
+            for counter, contribution in counters.items():
+                parent[counter] = parent.get(counter, 0) + sign * contribution(row)
+
+    def _delete_ids(self, table: str, ids: list):
+        rows = self.tables.get(table, {})
+        for row_id in ids:
+            row = rows.pop(row_id, None)
+            if row is not None:
+                self._unindex(table, row)
+                self._count(table, row, -1)
+        for child, column in CASCADES.get(table, []):
+            index = self._by_column.get((child, column), {})
+            child_ids = [child_id for row_id in ids for child_id in index.get(row_id, ())]
+            if child_ids:
+                self._delete_ids(child, child_ids)
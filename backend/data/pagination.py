@@ -0,0 +1,111 @@
+"""
+Keyset (cursor) pagination for list endpoints
+
+Pages are ordered newest first on (created_at, id) - or another timestamp
+column plus id - and the next page starts strictly after the last row
+served, so fetching page N costs the same as page 1 however deep it is (no
+OFFSET scan). Cursors are opaque to clients: url-safe base64 of the last
+row's [timestamp, id] ([timestamp, table, id] for listings merged from
+several tables). A NULL timestamp is kept as null and sorts first, as in
+Postgres. Page sizes are capped at MAX_PAGE_SIZE.
+"""
+import base64
+import json
+import os
+
+from .query import QueryError
+
+DEFAULT_PAGE_SIZE = int(os.environ.get("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "200"))
+
+
+class InvalidCursor(QueryError):
+    """A cursor that this module did not produce"""
+
+
+def page_size(limit) -> int:
+    """`limit` clamped to 1..MAX_PAGE_SIZE (DEFAULT_PAGE_SIZE when not given)"""
+    return max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+
+def encode_cursor(row: dict, column: str = "created_at", source: str = None) -> str:
+    key = [row[column], row["id"]] if source is None else [row[column], source, row["id"]]
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, merged: bool = False):
+    """(timestamp or None, source table or None, id) from a cursor; InvalidCursor when it is malformed,
+    or was issued for a merged listing (merged=True) when this is a single-table one, or vice versa"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if merged:
+            value, source, row_id = key
+            if not isinstance(source, str):
+                raise TypeError(source)
+        else:
+            (value, row_id), source = key, None
+        return (None if value is None else str(value)), source, int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("invalid cursor") from e
+
+
+def keyset(query, cursor: str = None, limit: int = None, column: str = "created_at", source: str = None):
+    """Order `query` newest first and restrict it to one page after `cursor`.
+
+    Rows without a timestamp come first, as Postgres sorts NULLs in descending order. For a merged
+    listing (see merge()) `source` names the table `query` reads; its cursor carries the table of the
+    last row served, which breaks ties between rows of different tables with the same timestamp.
+    Fetches one row more than the page size so page() can tell whether another page follows.
+    """
+    query = query.order(column, desc=True).order("id", desc=True)
+    if cursor:
+        value, last_source, row_id = decode_cursor(cursor, merged=source is not None)
+        # Rows with the cursor's timestamp follow it: all of them from a table that sorts after the last
+        # row's, none from one that sorts before it, and those with a lower id from the same table
+        ties = row_id if source == last_source else source < last_source
+        query = _after(query, column, value, ties)
+    return query.limit(page_size(limit) + 1)
+
+
+def _after(query, column: str, value, ties):
+    """`query` restricted to rows after timestamp `value`; `ties` is True (every row with that timestamp),
+    False (none) or the id that those rows must be below"""
+    if value is None:
+        # Every row with a timestamp sorts after the NULLs
+        if ties is True:
+            return query
+        if ties is False:
+            return query.or_(f"{column}.not.is.null")
+        return query.or_(f"and({column}.is.null,id.lt.{ties}),{column}.not.is.null")
+    if ties is True:
+        return query.lte(column, value)
+    if ties is False:
+        return query.lt(column, value)
+    quoted = '"' + value.replace('"', '\\"') + '"'
+    # PostgREST has no row comparison; the redundant lte() bound is what lets an index on
+    # (column DESC, id DESC) seek straight to the cursor instead of filtering every newer row
+    return query.lte(column, value).or_(f"{column}.lt.{quoted},and({column}.eq.{quoted},id.lt.{ties})")
+
+
+def merge(sources: dict, column: str = "created_at") -> list:
+    """Rows of several tables ({table: rows}, each read through keyset(..., source=table)) as one list in
+    keyset order: newest first, NULL timestamps first, then table and id descending. Each row is
+    returned as (table, row) for page()"""
+    tagged = [(table, row) for table, rows in sources.items() for row in rows]
+    tagged.sort(key=lambda item: (item[1].get(column) is None, item[1].get(column) or "", item[0], item[1]["id"]),
+                reverse=True)
+    return tagged
+
+
+def page(rows: list, limit: int = None, column: str = "created_at"):
+    """(rows of this page, next cursor or None) from rows fetched through keyset(), or the (table, row)
+    pairs of merge()"""
+    size = page_size(limit)
+    merged = bool(rows) and isinstance(rows[0], tuple)
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        source, last = rows[-1] if merged else (None, rows[-1])
+        next_cursor = encode_cursor(last, column, source)
+    return ([row for _, row in rows] if merged else rows), next_cursor
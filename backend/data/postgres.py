@@ -0,0 +1,201 @@
+"""
+Direct Postgres backend (psycopg2) for the LearnSphere data layer
+
+Compiles the PostgREST-style queries to SQL. Embedded resources such as
+"*, users(full_name)" become correlated row_to_json() subqueries, so
+responses have the same shape as through Supabase. Counts run as a
+separate count(*) (exact) or read the planner's row estimate (planned;
+estimated = planned, or exact when the plan expects few rows).
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from .query import Query, QueryError, Result, Rpc, embed_column
+
+OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "ilike": "ILIKE"}
+
+# count="estimated" switches from the planner estimate to count(*) below this many rows
+ESTIMATE_EXACT_BELOW = 10000
+
+
+def ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _plain(value):
+    """Match the JSON types PostgREST would have returned"""
+    if isinstance(value, datetime) or isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class SqlCompiler:
+    """Compiles a Query to (sql, params) with %s placeholders"""
+
+    def compile(self, query: Query):
+        return getattr(self, f"_compile_{query.operation}")(query)
+
+    def _adapt(self, value):
+        return value
+
+    def count_plan(self, query: Query):
+        """Statements for Result.count: ("exact" | "planned", sql, params) steps, in order"""
+        if query.count_mode == "exact":
+            return [("exact",) + self._compile_count(query, planned=False)]
+        steps = [("planned",) + self._compile_count(query, planned=True)]
+        if query.count_mode == "estimated":
+            steps.append(("exact",) + self._compile_count(query, planned=False))
+        return steps
+
+    @staticmethod
+    def planned_rows(row: dict) -> int:
+        plan = row["QUERY PLAN"]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _compile_count(self, query: Query, planned: bool):
+        params = []
+        where = self._where(query, params)
+        if planned:
+            return f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {ident(query.table)} t0{where}", params
+        return f"SELECT count(*) AS count FROM {ident(query.table)} t0{where}", params
+
+    def _compile_rpc(self, call: Rpc):
+        names = list(call.params)
+        arguments = ", ".join(f"{ident(name)} => %s" for name in names)
+        return f"SELECT * FROM {ident(call.name)}({arguments})", [self._adapt(call.params[n]) for n in names]
+
+    def _compile_select(self, query: Query):
+        params = []
+        sql = f"SELECT {self._select_list(query.table, 't0', query.selection, 1)} FROM {ident(query.table)} t0"
+        sql += self._where(query, params)
+        if query.ordering:
+            sql += " ORDER BY " + ", ".join(
+                f"t0.{ident(c)} {'DESC NULLS FIRST' if desc else 'ASC NULLS LAST'}" for c, desc in query.ordering)
+        if query.limit_count is not None:
+            sql += " LIMIT %s"
+            params.append(query.limit_count)
+        if query.offset_count:
+            sql += " OFFSET %s"
+            params.append(query.offset_count)
+        return sql, params
+
+    def _compile_insert(self, query: Query):
+        columns = sorted({c for row in query.payload for c in row})
+        params, groups = [], []
+        for row in query.payload:
+            values = []
+            for column in columns:
+                if column in row:
+                    values.append("%s")
+                    params.append(self._adapt(row[column]))
+                else:
+                    values.append("DEFAULT")
+            groups.append("(" + ", ".join(values) + ")")
+        sql = (f"INSERT INTO {ident(query.table)} ({', '.join(ident(c) for c in columns)}) "
+               f"VALUES {', '.join(groups)} RETURNING *")
+        return sql, params
+
+    def _compile_upsert(self, query: Query):
+        sql, params = self._compile_insert(query)
+        sql = sql[:-len(" RETURNING *")]
+        columns = sorted({c for row in query.payload for c in row} - set(query.on_conflict) - {"id"})
+        target = ", ".join(ident(c) for c in query.on_conflict)
+        if query.ignore_duplicates or not columns:
+            sql += f" ON CONFLICT ({target}) DO NOTHING"
+        else:
+            sql += f" ON CONFLICT ({target}) DO UPDATE SET " + ", ".join(
+                f"{ident(c)} = EXCLUDED.{ident(c)}" for c in columns)
+        return sql + " RETURNING *", params
+
+    def _compile_update(self, query: Query):
+        params = [self._adapt(v) for v in query.payload.values()]
+        assignments = ", ".join(f"{ident(c)} = %s" for c in query.payload)
+        sql = f"UPDATE {ident(query.table)} t0 SET {assignments}" + self._where(query, params) + " RETURNING *"
+        return sql, params
+
+    def _compile_delete(self, query: Query):
+        params = []
+        return f"DELETE FROM {ident(query.table)} t0" + self._where(query, params) + " RETURNING *", params
+
+    def _select_list(self, table: str, alias: str, selection, depth: int) -> str:
+        parts = [f"{alias}.*" if c == "*" else f"{alias}.{ident(c)}" for c in selection.columns]
+        for embed in selection.embeds:
+            inner = f"t{depth}"
+            columns = self._select_list(embed.table, inner, embed.selection, depth + 1)
+            parts.append(
+                f"(SELECT row_to_json(r{depth}) FROM (SELECT {columns} FROM {ident(embed.table)} {inner} "
+                f"WHERE {inner}.id = {alias}.{ident(embed_column(table, embed))}) r{depth}) AS {ident(embed.table)}")
+        return ", ".join(parts)
+
+    def _where(self, query: Query, params: list) -> str:
+        clauses = [self._condition(f, params) for f in query.filters]
+        return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+    def _condition(self, condition, params: list) -> str:
+        column, op, value = condition
+        if op in ("and", "or"):
+            return "(" + f" {op.upper()} ".join(self._condition(c, params) for c in value) + ")"
+        if op == "not":
+            return "NOT (" + " AND ".join(self._condition(c, params) for c in value) + ")"
+        target = f"t0.{ident(column)}"
+        if op == "in":
+            params.append(list(value))
+            return f"{target} = ANY(%s)"
+        if op == "is":
+            return f"{target} IS {'NULL' if value is None else 'TRUE' if value else 'FALSE'}"
+        params.append(self._adapt(value))
+        return f"{target} {OPERATORS[op]} %s"
+
+
+class PostgresBackend(SqlCompiler):
+    def __init__(self, dsn: str, min_connections: int = 1, max_connections: int = 10):
+        import psycopg2.extras
+        import psycopg2.pool
+
+        self._extras = psycopg2.extras
+        self.pool = psycopg2.pool.ThreadedConnectionPool(min_connections, max_connections, dsn)
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, name: str, params: dict = None) -> Rpc:
+        return Rpc(self, name, params)
+
+    def run(self, query) -> Result:
+        conn = self.pool.getconn()
+        count, rows = None, []
+        try:
+            with conn.cursor(cursor_factory=self._extras.RealDictCursor) as cur:
+                if getattr(query, "count_mode", None):
+                    count = self._count(cur, query)
+                if not getattr(query, "head", False):
+                    cur.execute(*self.compile(query))
+                    rows = cur.fetchall() if cur.description else []
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise QueryError(str(e)) from e
+        finally:
+            self.pool.putconn(conn)
+        return Result([{k: _plain(v) for k, v in row.items()} for row in rows], count)
+
+    def _count(self, cur, query: Query) -> int:
+        for kind, sql, params in self.count_plan(query):
+            cur.execute(sql, params)
+            row = cur.fetchone()
+            if kind == "exact":
+                return row["count"]
+            estimate = self.planned_rows(row)
+            if query.count_mode == "planned" or estimate >= ESTIMATE_EXACT_BELOW:
+                return estimate
+
+    def close(self):
+        self.pool.closeall()
+
+    def _adapt(self, value):
+        return self._extras.Json(value) if isinstance(value, (dict, list)) else value
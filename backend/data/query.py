@@ -0,0 +1,271 @@
+"""
+Query builder shared by the Postgres and in-memory backends
+
+It mirrors the subset of the supabase-py / PostgREST fluent API used by
+LearnSphere (table().select().eq().order().execute() and friends,
+select(..., count="exact", head=True), upsert(), or_() and rpc()), so the
+repositories run unchanged on any backend. A backend only implements run(query) -> Result.
+"""
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+# (table, embedded table) -> foreign key column on `table`, where it is not
+# simply "<embedded table in singular>_id"
+FOREIGN_KEYS = {
+    ("courses", "users"): "instructor_id",
+    ("instructor_messages", "users"): "instructor_id",
+    ("admin_messages", "users"): "instructor_id",
+    ("instructor_login_logs", "users"): "instructor_id",
+}
+
+
+COUNT_MODES = ("exact", "planned", "estimated")
+LOGIC_OPERATORS = ("eq", "neq", "gt", "gte", "lt", "lte", "is", "ilike", "in")
+
+
+class QueryError(Exception):
+    """Raised by non-Supabase backends where PostgREST would return an error"""
+
+
+@dataclass
+class Embed:
+    table: str
+    hint: Optional[str]
+    selection: "Selection"
+
+
+@dataclass
+class Selection:
+    columns: List[str] = field(default_factory=list)
+    embeds: List[Embed] = field(default_factory=list)
+
+
+@dataclass
+class Result:
+    data: list
+    count: Optional[int] = None
+
+
+def parse_select(text: str) -> Selection:
+    """Parse "*, users(full_name, email)" / "*, users!fk_name(*)" into a Selection"""
+    selection = Selection()
+    for part in _split_top_level(text):
+        if "(" in part:
+            head, _, body = part.partition("(")
+            table, _, hint = head.strip().partition("!")
+            selection.embeds.append(Embed(table.strip(), hint.strip() or None, parse_select(body[:body.rindex(")")])))
+        elif part:
+            selection.columns.append(part)
+    if not selection.columns and not selection.embeds:
+        selection.columns.append("*")
+    return selection
+
+
+def embed_column(table: str, embed: Embed) -> str:
+    """Foreign key column on `table` that points at the embedded table's id"""
+    if embed.hint and embed.hint.endswith("_fkey") and embed.hint.startswith(table + "_"):
+        return embed.hint[len(table) + 1:-len("_fkey")]
+    if (table, embed.table) in FOREIGN_KEYS:
+        return FOREIGN_KEYS[(table, embed.table)]
+    return embed.table[:-1] + "_id" if embed.table.endswith("s") else embed.table + "_id"
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def parse_logic(text: str) -> list:
+    """Parse a PostgREST logic tree, e.g. 'created_at.lt."2026-01-01",and(created_at.eq."2026-01-01",id.lt.7)',
+    into filters: (column, op, value) leaves and (None, "and" | "or" | "not", [filters]) groups ("not" from
+    column.not.op.value). Values stay strings, as PostgREST receives them; double-quote values containing , . : ( )"""
+    filters, position = _parse_logic(text.strip(), 0)
+    if position != len(text.strip()):
+        raise QueryError(f"unexpected {text.strip()[position:]!r} in logic filter")
+    return filters
+
+
+def _parse_logic(text: str, position: int):
+    filters = []
+    while position < len(text):
+        for group in ("and(", "or("):
+            if text.startswith(group, position):
+                children, position = _parse_logic(text, position + len(group))
+                if not text.startswith(")", position):
+                    raise QueryError(f"unbalanced parentheses in logic filter {text!r}")
+                filters.append((None, group[:-1], children))
+                position += 1
+                break
+        else:
+            column, _, rest = text[position:].partition(".")
+            op, _, rest = rest.partition(".")
+            negated = op == "not"
+            if negated:
+                op, _, rest = rest.partition(".")
+            if op not in LOGIC_OPERATORS or not column:
+                raise QueryError(f"cannot parse logic filter at {text[position:]!r}")
+            position += len(column) + len(op) + 2 + (4 if negated else 0)
+            value, position = _logic_value(text, position)
+            if op == "in":
+                value = [v.strip().strip('"') for v in value.strip("()").split(",") if v.strip()]
+            elif op == "is":
+                value = {"null": None, "true": True, "false": False}.get(value, value)
+            filters.append((None, "not", [(column, op, value)]) if negated else (column, op, value))
+        if text.startswith(",", position):
+            position += 1
+        elif position < len(text) and text[position] != ")":
+            raise QueryError(f"expected ',' in logic filter at {text[position:]!r}")
+        else:
+            break
+    return filters, position
+
+
+def _logic_value(text: str, position: int):
+    if text.startswith('"', position):
+        end = position + 1
+        while end < len(text) and text[end] != '"':
+            end += 2 if text[end] == "\\" else 1
+        return text[position + 1:end].replace('\\"', '"'), end + 1
+    if text.startswith("(", position):
+        end = text.index(")", position) + 1
+        return text[position:end], end
+    end = position
+    while end < len(text) and text[end] not in ",)":
+        end += 1
+    return text[position:end], end
+
+
+class Query:
+    """One PostgREST-style request against a table"""
+
+    def __init__(self, backend, table: str):
+        self.backend = backend
+        self.table = table
+        self.operation = "select"
+        self.selection = parse_select("*")
+        self.payload = None
+        self.filters = []  # (column, op, value)
+        self.ordering = []  # (column, desc)
+        self.limit_count = None
+        self.offset_count = 0
+        self.count_mode = None
+        self.head = False
+        self.on_conflict = ()  # upsert: natural key columns
+        self.ignore_duplicates = False
+
+    # Operations
+
+    def select(self, *columns: str, count: str = None, head: bool = False, **_options):
+        """`count` ("exact", "planned" or "estimated") fills Result.count; `head` skips the rows"""
+        if count is not None and count not in COUNT_MODES:
+            raise QueryError(f"count must be one of {', '.join(COUNT_MODES)}")
+        self.operation = "select"
+        self.selection = parse_select(",".join(columns) if columns else "*")
+        self.count_mode = count
+        self.head = head
+        return self
+
+    def insert(self, payload, **_options):
+        self.operation = "insert"
+        self.payload = payload if isinstance(payload, list) else [payload]
+        return self
+
+    def upsert(self, payload, on_conflict: str = "", ignore_duplicates: bool = False, **_options):
+        """INSERT ... ON CONFLICT (on_conflict) DO UPDATE the payload's columns, or DO NOTHING
+        with `ignore_duplicates` (only newly inserted rows come back then)"""
+        if not on_conflict:
+            raise QueryError("upsert needs on_conflict columns")
+        self.operation = "upsert"
+        self.payload = payload if isinstance(payload, list) else [payload]
+        self.on_conflict = tuple(c.strip() for c in on_conflict.split(","))
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload: dict, **_options):
+        self.operation = "update"
+        self.payload = payload
+        return self
+
+    def delete(self, **_options):
+        self.operation = "delete"
+        return self
+
+    # Filters
+
+    def eq(self, column: str, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value):
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values):
+        return self._filter(column, "in", list(values))
+
+    def is_(self, column: str, value):
+        return self._filter(column, "is", None if value in (None, "null") else value)
+
+    def ilike(self, column: str, pattern: str):
+        return self._filter(column, "ilike", pattern)
+
+    def or_(self, filters: str, **_options):
+        """Rows matching any of the PostgREST logic tree `filters` (see parse_logic)"""
+        return self._filter(None, "or", parse_logic(filters))
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False, **_options):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count: int, **_options):
+        self.limit_count = count
+        return self
+
+    def range(self, start: int, end: int, **_options):
+        self.offset_count = start
+        self.limit_count = end - start + 1
+        return self
+
+    def execute(self) -> Result:
+        return self.backend.run(self)
+
+    def _filter(self, column: str, op: str, value):
+        self.filters.append((column, op, value))
+        return self
+
+
+class Rpc:
+    """A stored function call, client.rpc(name, params).execute(), as in PostgREST"""
+
+    operation = "rpc"
+
+    def __init__(self, backend, name: str, params: dict = None):
+        self.backend = backend
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> Result:
+        return self.backend.run(self)
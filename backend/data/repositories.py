@@ -0,0 +1,285 @@
+"""
+Repositories - one class per aggregate, written once against the
+PostgREST-style client API so they run on every backend.
+
+Methods return plain rows (dicts), lists of rows or None; callers never
+see backend response objects. `columns` arguments take PostgREST select
+syntax, including embeds such as "*, users(full_name)".
+
+Over an async client (see data.aio) the same methods return awaitables:
+`await arepo.courses.get(1)`.
+
+Counting happens in the database: count() asks for count="exact" (or
+"estimated") with head=True, so no rows are transferred just to be
+len()'ed. Per-course and per-user counts are stored columns and views
+(migrations/004_user_summaries.sql, 005_course_counters.sql).
+
+page() and the other *page* methods return one keyset page (see
+data.pagination): {"items", "next_cursor", "total_estimate"}.
+"""
+from .pagination import keyset, page
+
+
+def _first(rows):
+    return rows[0] if rows else None
+
+
+def _shape(result, first: bool, then, count: bool = False, raw: bool = False):
+    value = result if raw else result.count if count else _first(result.data) if first else result.data
+    return then(value) if then else value
+
+
+def _page_of(result, limit, column: str) -> dict:
+    items, next_cursor = page(result.data, limit, column)
+    return {"items": items, "next_cursor": next_cursor, "total_estimate": result.count}
+
+
+class Repository:
+    table = None
+    key = None  # natural key columns, backed by a unique constraint, for upsert()
+
+    def __init__(self, client):
+        self.client = client
+        self.is_async = getattr(client, "is_async", False)
+
+    def query(self):
+        return self.client.table(self.table)
+
+    def _fetch(self, query, first: bool = False, then=None, count: bool = False, raw: bool = False):
+        """Execute `query` and return its rows (first row, count, or the whole result), mapped through `then`"""
+        if self.is_async:
+            return self._fetch_async(query, first, then, count, raw)
+        return _shape(query.execute(), first, then, count, raw)
+
+    async def _fetch_async(self, query, first: bool, then, count: bool, raw: bool):
+        return _shape(await query.execute(), first, then, count, raw)
+
+    def _done(self, value):
+        """`value` as a method result, awaitable over an async client"""
+        if self.is_async:
+            async def resolved():
+                return value
+            return resolved()
+        return value
+
+    def get(self, row_id: int, columns: str = "*"):
+        return self._fetch(self.query().select(columns).eq("id", row_id), first=True)
+
+    def page(self, columns: str = "*", cursor: str = None, limit: int = None, include_total: bool = False, **filters):
+        """One page of rows matching the equality filters, newest first; total_estimate on the first page
+        when `include_total`"""
+        return self._page(self.table, columns, cursor, limit, include_total, filters)
+
+    def _page(self, table: str, columns: str, cursor, limit, include_total: bool, filters: dict,
+              column: str = "created_at"):
+        query = self.client.table(table).select(columns, count="estimated" if include_total and not cursor else None)
+        for name, value in filters.items():
+            query = query.eq(name, value)
+        return self._fetch(keyset(query, cursor, limit, column), raw=True,
+                           then=lambda result: _page_of(result, limit, column))
+
+    def count(self, estimated: bool = False, **filters) -> int:
+        """Rows matching the equality filters, counted server-side"""
+        return self._count_in(self.table, estimated, filters)
+
+    def _count_in(self, table: str, estimated: bool, filters: dict):
+        query = self.client.table(table).select("id", count="estimated" if estimated else "exact", head=True)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        return self._fetch(query, count=True)
+
+    def create(self, row: dict):
+        return self._fetch(self.query().insert(row), first=True)
+
+    def upsert(self, row: dict, ignore_duplicates: bool = False):
+        """Insert `row`, or on a natural-key conflict update its columns (or leave the row alone with
+        `ignore_duplicates`), in one statement. Returns the written row; None when a duplicate was ignored"""
+        query = self.query().upsert(row, on_conflict=",".join(self.key), ignore_duplicates=ignore_duplicates)
+        return self._fetch(query, first=True)
+
+    def create_many(self, rows: list) -> list:
+        if not rows:
+            return self._done([])
+        return self._fetch(self.query().insert(rows))
+
+    def update(self, row_id: int, fields: dict) -> list:
+        return self._fetch(self.query().update(fields).eq("id", row_id))
+
+    def delete(self, row_id: int) -> list:
+        return self._fetch(self.query().delete().eq("id", row_id))
+
+
+class UserRepository(Repository):
+    table = "users"
+
+    def get_by_email(self, email: str, columns: str = "*"):
+        return self._fetch(self.query().select(columns).eq("email", email.lower()), first=True)
+
+    def list(self, columns: str = "*", role: str = None) -> list:
+        query = self.query().select(columns)
+        if role:
+            query = query.eq("role", role)
+        return self._fetch(query.order("created_at", desc=True))
+
+    def list_summaries(self, columns: str = "*", role: str = None) -> list:
+        """Users with enrollment_count and course_count from the user_summaries view"""
+        query = self.client.table("user_summaries").select(columns)
+        if role:
+            query = query.eq("role", role)
+        return self._fetch(query.order("created_at", desc=True))
+
+    def page_summaries(self, columns: str = "*", cursor: str = None, limit: int = None, include_total: bool = False,
+                       role: str = None):
+        """One page of the user_summaries view (see list_summaries)"""
+        return self._page("user_summaries", columns, cursor, limit, include_total, {"role": role} if role else {})
+
+    def get_any_admin(self, columns: str = "id"):
+        return self._fetch(self.query().select(columns).eq("role", "admin").limit(1), first=True)
+
+
+class SessionRepository(Repository):
+    table = "sessions"
+
+    def get_active(self, token: str, now: str):
+        """Unexpired session for the token, with its user embedded as "users" """
+        return self._fetch(self.query().select("*, users(*)").eq("token", token).gt("expires_at", now), first=True)
+
+    def create_for_user(self, user_id: int, token: str, expires_at: str):
+        return self.create({"user_id": user_id, "token": token, "expires_at": expires_at})
+
+    def delete_token(self, token: str):
+        return self._fetch(self.query().delete().eq("token", token))
+
+    def list_revocations(self, now: int) -> list:
+        return self._fetch(self.client.table("session_revocations").select(
+            "session_id, user_id, revoked_at, expires_at").gt("expires_at", now))
+
+    def add_revocation(self, row: dict):
+        return self._fetch(self.client.table("session_revocations").insert(row))
+
+
+class CourseRepository(Repository):
+    table = "courses"
+
+    def get_owned(self, course_id: int, instructor_id: int, columns: str = "*"):
+        return self._fetch(self.query().select(columns).eq("id", course_id).eq("instructor_id", instructor_id), first=True)
+
+    def list_all(self, columns: str = "*") -> list:
+        return self._fetch(self.query().select(columns).order("created_at", desc=True))
+
+    def list_for_instructor(self, instructor_id: int, columns: str = "*") -> list:
+        return self._fetch(self.query().select(columns).eq("instructor_id", instructor_id).order("created_at", desc=True))
+
+    def list_published(self, columns: str = "*", public_only: bool = False) -> list:
+        query = self.query().select(columns).eq("published", True)
+        if public_only:
+            query = query.eq("visibility", "public")
+        return self._fetch(query.order("created_at", desc=True))
+
+
+class LessonRepository(Repository):
+    table = "lessons"
+
+    def list_for_course(self, course_id: int, columns: str = "*") -> list:
+        return self._fetch(self.query().select(columns).eq("course_id", course_id).order("order_index"))
+
+    def delete_for_course(self, course_id: int):
+        return self._fetch(self.query().delete().eq("course_id", course_id))
+
+
+class EnrollmentRepository(Repository):
+    table = "enrollments"
+    key = ("user_id", "course_id")
+
+    def get_for(self, user_id: int, course_id: int, columns: str = "*"):
+        return self._fetch(self.query().select(columns).eq("user_id", user_id).eq("course_id", course_id), first=True)
+
+    def list_for_user(self, user_id: int, columns: str = "*") -> list:
+        return self._fetch(self.query().select(columns).eq("user_id", user_id))
+
+    def list_for_course(self, course_id: int, columns: str = "*") -> list:
+        return self._fetch(self.query().select(columns).eq("course_id", course_id))
+
+    def update_for(self, user_id: int, course_id: int, fields: dict) -> list:
+        return self._fetch(self.query().update(fields).eq("user_id", user_id).eq("course_id", course_id))
+
+
+class LessonProgressRepository(Repository):
+    table = "lesson_progress"
+    key = ("user_id", "lesson_id")
+
+    def get_for(self, user_id: int, lesson_id: int, columns: str = "*"):
+        return self._fetch(self.query().select(columns).eq("user_id", user_id).eq("lesson_id", lesson_id), first=True)
+
+    def update_for(self, user_id: int, lesson_id: int, fields: dict) -> list:
+        return self._fetch(self.query().update(fields).eq("user_id", user_id).eq("lesson_id", lesson_id))
+
+    def list_for_course(self, user_id: int, course_id: int, columns: str = "*") -> list:
+        return self._fetch(self.query().select(columns).eq("user_id", user_id).eq("course_id", course_id))
+
+    def list_completed(self, user_id: int, course_id: int = None, columns: str = "id", order: str = None) -> list:
+        query = self.query().select(columns).eq("user_id", user_id)
+        if course_id is not None:
+            query = query.eq("course_id", course_id)
+        query = query.eq("is_completed", True)
+        if order:
+            query = query.order(order)
+        return self._fetch(query)
+
+    def complete_lesson(self, user_id: int, lesson_id: int):
+        """Completion pipeline in one transaction: {course_id, first_completion, progress_percentage,
+        status, certificate}, or None for an unknown lesson"""
+        return self._fetch(self.client.rpc("complete_lesson", {"p_user_id": user_id, "p_lesson_id": lesson_id}), first=True)
+
+
+class ReviewRepository(Repository):
+    table = "course_reviews"
+    key = ("user_id", "course_id")
+
+
+class QuizRepository(Repository):
+    table = "quizzes"
+
+    def count_attempts(self, user_id: int, quiz_id: int) -> int:
+        return self._count_in("quiz_attempts", False, {"user_id": user_id, "quiz_id": quiz_id})
+
+    def add_attempt(self, row: dict):
+        return self._fetch(self.client.table("quiz_attempts").insert(row), first=True)
+
+
+class PointsRepository(Repository):
+    table = "user_points"
+
+    def list_for_user(self, user_id: int, columns: str = "*") -> list:
+        return self._fetch(self.query().select(columns).eq("user_id", user_id))
+
+    def total_for_user(self, user_id: int) -> int:
+        return self._fetch(self.query().select("points").eq("user_id", user_id),
+                           then=lambda rows: sum(row.get("points") or 0 for row in rows))
+
+
+class NotificationRepository(Repository):
+    table = "notifications"
+
+    def list_for_user(self, user_id: int, limit: int = 50) -> list:
+        return self._fetch(self.query().select("*").eq("user_id", user_id).order("created_at", desc=True).limit(limit))
+
+    def mark_read(self, notification_id: int, user_id: int):
+        return self._fetch(self.query().update({"is_read": True}).eq("id", notification_id).eq("user_id", user_id))
+
+
+class Repositories:
+    """All repositories over one backend client"""
+
+    def __init__(self, client):
+        self.client = client
+        self.users = UserRepository(client)
+        self.sessions = SessionRepository(client)
+        self.courses = CourseRepository(client)
+        self.lessons = LessonRepository(client)
+        self.enrollments = EnrollmentRepository(client)
+        self.progress = LessonProgressRepository(client)
+        self.reviews = ReviewRepository(client)
+        self.quizzes = QuizRepository(client)
+        self.points = PointsRepository(client)
+        self.notifications = NotificationRepository(client)
@@ -0,0 +1,113 @@
+"""
+Demo dataset for the in-memory backend
+
+Every seeded account uses the same password (default "password123"):
+admin@test.com, instructor@test.com, learner@test.com, plus numbered
+instructorN@test.com / learnerN@test.com accounts.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import bcrypt
+
+
+def seed_demo_data(client, scale: int = 1, password: str = "password123", rng_seed: int = 42) -> dict:
+    """Fill `client` with users, courses, lessons, enrollments and progress.
+
+    `scale` multiplies every count: scale 1 is 20 instructors, 200
+    learners and 50 courses of 10 lessons; learners enroll in up to 5.
+    """
+    rng = random.Random(rng_seed)
+    # Low cost on purpose; the login path rehashes to policy in the background
+    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt(4)).decode()
+    now = datetime.now(timezone.utc)
+
+    def ago(days: float) -> str:
+        return (now - timedelta(days=days)).isoformat()
+
+    def user(email, name, role, age):
+        return {"email": email, "full_name": name, "password_hash": password_hash,
+                "role": role, "is_approved": True, "created_at": ago(age)}
+
+    users = [user("admin@test.com", "Admin User", "admin", 400),
+             user("instructor@test.com", "Demo Instructor", "instructor", 390),
+             user("learner@test.com", "Demo Learner", "learner", 380)]
+    users += [user(f"instructor{i}@test.com", f"Instructor {i}", "instructor", rng.uniform(30, 365))
+              for i in range(1, 20 * scale)]
+    users += [user(f"learner{i}@test.com", f"Learner {i}", "learner", rng.uniform(1, 365))
+              for i in range(1, 200 * scale)]
+    users = client.table("users").insert(users).execute().data
+    instructors = [u for u in users if u["role"] == "instructor"]
+    learners = [u for u in users if u["role"] == "learner"]
+
+    courses = []
+    for i in range(50 * scale):
+        courses.append({
+            # The demo instructor owns every fifth course
+            "instructor_id": instructors[0]["id"] if i % 5 == 0 else rng.choice(instructors)["id"],
+            "title": f"Course {i + 1}",
+            "subject_name": rng.choice(["Python", "Design", "Data", "Cloud", "Security"]),
+            "tagline": f"Learn topic {i + 1} step by step",
+            "short_description": f"A practical introduction to topic {i + 1}.",
+            "full_description": " ".join(f"Paragraph {p} about topic {i + 1}." for p in range(40)),
+            "image_url": f"https://picsum.photos/seed/{i}/640/360",
+            "visibility": "public" if i % 5 else "signed_in",
+            "access": "free",
+            "published": i % 10 != 9,
+            "created_at": ago(rng.uniform(1, 300)),
+        })
+    courses = client.table("courses").insert(courses).execute().data
+
+    lessons = []
+    for course in courses:
+        for order in range(10):
+            lessons.append({
+                "course_id": course["id"],
+                "title": f"{course['title']} - Lesson {order + 1}",
+                "description": f"Lesson {order + 1} of {course['title']}",
+                "content": " ".join(f"Content block {b}." for b in range(200)),
+                "video_url": "https://www.youtube.com/embed/dQw4w9WgXcQ",
+                "duration": rng.randint(3, 30),
+                "order_index": order,
+                "lesson_type": rng.choice(["video", "video", "document", "quiz"]),
+            })
+    lessons = client.table("lessons").insert(lessons).execute().data
+    lessons_by_course = {}
+    for lesson in lessons:
+        lessons_by_course.setdefault(lesson["course_id"], []).append(lesson)
+
+    enrollments, progress = [], []
+    published = [c for c in courses if c["published"]]
+    for learner in learners:
+        # The demo learner (learners[0]) always has a few courses under way
+        count = rng.randint(3 if learner is learners[0] else 0, 5)
+        for course in rng.sample(published, min(len(published), count)):
+            course_lessons = lessons_by_course[course["id"]]
+            done = rng.randint(0, len(course_lessons))
+            pct = int(done / len(course_lessons) * 100)
+            enrollments.append({
+                "user_id": learner["id"], "course_id": course["id"], "progress_percentage": pct,
+                "status": "completed" if pct == 100 else "in_progress" if done else "not_started",
+                "is_paid": True, "enrolled_at": ago(rng.uniform(1, 200)),
+            })
+            for lesson in course_lessons[:done]:
+                progress.append({
+                    "user_id": learner["id"], "course_id": course["id"], "lesson_id": lesson["id"],
+                    "status": "completed", "is_completed": True, "completed_at": ago(rng.uniform(0, 60)),
+                })
+    client.table("enrollments").insert(enrollments).execute()
+    if progress:
+        client.table("lesson_progress").insert(progress).execute()
+    client.table("badges").insert({"name": "Course Completed", "description": "Completed a course", "icon": "🏆"}).execute()
+
+    quizzes = [{
+        "course_id": lesson["course_id"], "lesson_id": lesson["id"], "title": f"{lesson['title']} - Quiz",
+        "questions": [{"question": f"Question {q + 1}", "options": ["A", "B", "C", "D"], "correct_answer": "A"}
+                      for q in range(5)],
+        "attempt_rewards": {"attempt_1": 50, "attempt_2": 40, "attempt_3": 30, "attempt_4": 25},
+    } for lesson in lessons if lesson["lesson_type"] == "quiz"]
+    if quizzes:
+        client.table("quizzes").insert(quizzes).execute()
+
+    return {"users": len(users), "courses": len(courses), "lessons": len(lessons),
+            "enrollments": len(enrollments), "lesson_progress": len(progress), "quizzes": len(quizzes)}
@@ -0,0 +1,186 @@
+"""
+Scheduled in-process maintenance jobs for LearnSphere
+
+SessionSweeper deletes expired sessions (and expired signed-token
+revocations) in chunks of SESSION_SWEEP_CHUNK rows, pausing
+SESSION_SWEEP_PAUSE seconds between chunks so no single delete holds
+locks for long. With SESSION_MAX_PER_USER set, every user keeps only their
+newest sessions: users are walked by id, SESSION_SWEEP_CHUNK at a time, and
+the database trims each chunk's extra sessions (trim_user_sessions, see
+migrations/010_session_cap.sql), whichever worker created them. The cap
+applies to stored sessions only; signed tokens (SESSION_TOKEN_MODE=signed)
+are not stored and not capped.
+
+CounterReconciler recomputes the trigger-maintained course counters
+(lesson_count, enrollment_count, completion_count, total_duration) every
+COUNTER_RECONCILE_INTERVAL seconds, COUNTER_RECONCILE_CHUNK courses per
+call, and repairs any that drifted.
+"""
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+import metrics
+
+SESSION_SWEEP_INTERVAL = float(os.environ.get("SESSION_SWEEP_INTERVAL", "3600"))
+SESSION_SWEEP_CHUNK = int(os.environ.get("SESSION_SWEEP_CHUNK", "500"))
+SESSION_SWEEP_PAUSE = float(os.environ.get("SESSION_SWEEP_PAUSE", "0.5"))
+SESSION_MAX_PER_USER = int(os.environ.get("SESSION_MAX_PER_USER", "0"))
+COUNTER_RECONCILE_INTERVAL = float(os.environ.get("COUNTER_RECONCILE_INTERVAL", "21600"))
+COUNTER_RECONCILE_CHUNK = int(os.environ.get("COUNTER_RECONCILE_CHUNK", "500"))
+
+rows_purged = metrics.counter("maintenance_rows_purged_total", "Rows deleted by maintenance jobs")
+sweep_seconds = metrics.histogram(
+    "maintenance_sweep_seconds", "Duration of one maintenance run", (0.1, 0.5, 1, 5, 10, 30, 60, 300, 900))
+counters_repaired = metrics.counter(
+    "maintenance_counters_repaired_total", "Courses whose denormalized counters had drifted and were repaired")
+
+
+class PeriodicJob(ABC):
+    """Runs run_once() on a daemon thread every `interval` seconds (0 disables)"""
+    name = "job"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_report = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @abstractmethod
+    def run_once(self) -> dict:
+        """Do one pass of the job and return its report"""
+
+    def start(self):
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in {self.name}: {e}")
+            if self._stop.wait(self.interval):
+                break
+
+
+class SessionSweeper(PeriodicJob):
+    name = "session-sweeper"
+
+    def __init__(self, client, interval: float = SESSION_SWEEP_INTERVAL, chunk_size: int = SESSION_SWEEP_CHUNK,
+                 pause: float = SESSION_SWEEP_PAUSE, max_per_user: int = SESSION_MAX_PER_USER, on_evicted=None):
+        """`on_evicted(tokens)` is called with tokens removed by the per-user cap"""
+        super().__init__(interval)
+        self.client = client
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.max_per_user = max_per_user
+        self.on_evicted = on_evicted
+
+    def run_once(self) -> dict:
+        """Run every job once and return {"expired_sessions", "revocations", "over_cap", "seconds"}"""
+        with self._run_lock:
+            started = time.perf_counter()
+            now = datetime.now(timezone.utc).isoformat()
+            report = {
+                "expired_sessions": self._purge("sessions", "expires_at", now),
+                "revocations": self._purge("session_revocations", "expires_at", int(time.time())),
+                "over_cap": self._enforce_cap(),
+            }
+            report["seconds"] = round(time.perf_counter() - started, 3)
+            sweep_seconds.observe(report["seconds"], job="sessions")
+            self.last_report = report
+            print(f"🧹 Session sweep: {report['expired_sessions']} expired, {report['revocations']} revocations, "
+                  f"{report['over_cap']} over cap removed in {report['seconds']}s")
+            return report
+
+    def _purge(self, table: str, column: str, cutoff) -> int:
+        purged = 0
+        while not self._stop.is_set():
+            try:
+                result = self.client.table(table).select("id").lt(column, cutoff).limit(self.chunk_size).execute()
+            except Exception as e:
+                print(f"Error scanning {table} for expired rows: {e}")
+                break
+            ids = [row["id"] for row in result.data]
+            if not ids:
+                break
+            self.client.table(table).delete().in_("id", ids).execute()
+            purged += len(ids)
+            rows_purged.inc(len(ids), table=table)
+            if len(ids) < self.chunk_size:
+                break
+            self._stop.wait(self.pause)
+        return purged
+
+    def _enforce_cap(self) -> int:
+        if self.max_per_user <= 0:
+            return 0
+        removed, last_id = 0, 0
+        while not self._stop.is_set():
+            # Walk users by id; each call trims the sessions of one chunk of users
+            ids = [row["id"] for row in self.client.table("users").select("id").gt("id", last_id).order(
+                "id").limit(self.chunk_size).execute().data]
+            if not ids:
+                break
+            tokens = [row["token"] for row in self.client.rpc("trim_user_sessions", {
+                "p_max_per_user": self.max_per_user, "p_user_ids": ids}).execute().data]
+            if tokens:
+                if self.on_evicted:
+                    self.on_evicted(tokens)
+                removed += len(tokens)
+                rows_purged.inc(len(tokens), table="sessions_over_cap")
+            last_id = ids[-1]
+            if len(ids) < self.chunk_size:
+                break
+            self._stop.wait(self.pause)
+        return removed
+
+
+class CounterReconciler(PeriodicJob):
+    name = "counter-reconciler"
+
+    def __init__(self, client, interval: float = COUNTER_RECONCILE_INTERVAL, chunk_size: int = COUNTER_RECONCILE_CHUNK,
+                 pause: float = SESSION_SWEEP_PAUSE):
+        super().__init__(interval)
+        self.client = client
+        self.chunk_size = chunk_size
+        self.pause = pause
+
+    def run_once(self) -> dict:
+        """Reconcile every course once and return {"courses", "repaired", "seconds"}"""
+        with self._run_lock:
+            started = time.perf_counter()
+            checked, repaired, last_id = 0, [], 0
+            while not self._stop.is_set():
+                # Walk courses by id so each call locks at most chunk_size rows
+                ids = [row["id"] for row in self.client.table("courses").select("id").gt("id", last_id).order(
+                    "id").limit(self.chunk_size).execute().data]
+                if not ids:
+                    break
+                fixed = self.client.rpc("reconcile_course_counters", {"p_course_ids": ids}).execute().data
+                repaired.extend(row["course_id"] for row in fixed)
+                checked += len(ids)
+                last_id = ids[-1]
+                if len(ids) < self.chunk_size:
+                    break
+                self._stop.wait(self.pause)
+            if repaired:
+                counters_repaired.inc(len(repaired))
+            report = {"courses": checked, "repaired": repaired, "seconds": round(time.perf_counter() - started, 3)}
+            sweep_seconds.observe(report["seconds"], job="counters")
+            self.last_report = report
+            print(f"🧮 Counter reconcile: {checked} courses checked, {len(repaired)} repaired in {report['seconds']}s")
+            return report
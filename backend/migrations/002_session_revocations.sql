@@ -0,0 +1,16 @@
+-- Migration: Revocation list for signed session tokens
+-- Date: October 17, 2026
+
+-- One row per revoked session (session_id set) or per user-wide revocation
+-- (session_id NULL: every token issued at or before revoked_at is invalid).
+-- Times are unix epoch seconds, matching the token payload.
+CREATE TABLE IF NOT EXISTS session_revocations (
+    id SERIAL PRIMARY KEY,
+    session_id VARCHAR(64),
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    revoked_at BIGINT NOT NULL,
+    expires_at BIGINT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_session_revocations_expires ON session_revocations(expires_at);
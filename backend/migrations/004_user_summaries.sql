@@ -0,0 +1,27 @@
+-- Migration: Users with their enrollment and course counts (admin listings)
+-- Date: October 17, 2026
+
+-- One row per user with the counts the admin user and instructor pages show,
+-- aggregated by one GROUP BY per child table and joined back to users, so a
+-- listing is a single query however many users there are. Password hashes
+-- stay out of the view; security_invoker keeps the caller's row level
+-- security in force (Postgres 15+).
+CREATE OR REPLACE VIEW user_summaries WITH (security_invoker = true) AS
+SELECT
+    u.id,
+    u.full_name,
+    u.email,
+    u.role,
+    u.is_approved,
+    u.created_at,
+    COALESCE(e.enrollment_count, 0) AS enrollment_count,
+    COALESCE(c.course_count, 0) AS course_count
+FROM users u
+LEFT JOIN (
+    SELECT user_id, count(*) AS enrollment_count FROM enrollments GROUP BY user_id
+) e ON e.user_id = u.id
+LEFT JOIN (
+    SELECT instructor_id, count(*) AS course_count FROM courses GROUP BY instructor_id
+) c ON c.instructor_id = u.id;
+
+CREATE INDEX IF NOT EXISTS idx_users_role_created ON users(role, created_at DESC);
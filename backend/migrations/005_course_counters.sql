@@ -0,0 +1,87 @@
+-- Migration: Denormalized lesson/enrollment counters on courses
+-- Date: October 17, 2026
+
+-- Course cards and dashboards read these columns instead of counting child
+-- rows on every load. Triggers keep them current inside the same transaction
+-- as the lesson or enrollment write, whichever endpoint (or cascade) made it;
+-- reconcile_course_counters() recomputes them from scratch to repair drift.
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS lesson_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS enrollment_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS completion_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS total_duration INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION course_lesson_counters() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE courses
+        SET lesson_count = lesson_count - 1, total_duration = total_duration - COALESCE(OLD.duration, 0)
+        WHERE id = OLD.course_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE courses
+        SET lesson_count = lesson_count + 1, total_duration = total_duration + COALESCE(NEW.duration, 0)
+        WHERE id = NEW.course_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION course_enrollment_counters() RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE courses
+        SET enrollment_count = enrollment_count - 1,
+            completion_count = completion_count - (OLD.status = 'completed')::INTEGER
+        WHERE id = OLD.course_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE courses
+        SET enrollment_count = enrollment_count + 1,
+            completion_count = completion_count + (NEW.status = 'completed')::INTEGER
+        WHERE id = NEW.course_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS lessons_course_counters ON lessons;
+CREATE TRIGGER lessons_course_counters
+AFTER INSERT OR DELETE OR UPDATE OF course_id, duration ON lessons
+FOR EACH ROW EXECUTE FUNCTION course_lesson_counters();
+
+DROP TRIGGER IF EXISTS enrollments_course_counters ON enrollments;
+CREATE TRIGGER enrollments_course_counters
+AFTER INSERT OR DELETE OR UPDATE OF course_id, status ON enrollments
+FOR EACH ROW EXECUTE FUNCTION course_enrollment_counters();
+
+-- Recompute the counters of p_course_ids (every course when NULL) and return
+-- the courses whose stored values had drifted, with the corrected values.
+CREATE OR REPLACE FUNCTION reconcile_course_counters(p_course_ids BIGINT[] DEFAULT NULL)
+RETURNS TABLE (course_id BIGINT, lesson_count INTEGER, enrollment_count INTEGER,
+               completion_count INTEGER, total_duration INTEGER)
+LANGUAGE sql AS $$
+    WITH actual AS (
+        SELECT
+            c.id,
+            (SELECT count(*) FROM lessons l WHERE l.course_id = c.id)::INTEGER AS lesson_count,
+            (SELECT count(*) FROM enrollments e WHERE e.course_id = c.id)::INTEGER AS enrollment_count,
+            (SELECT count(*) FROM enrollments e WHERE e.course_id = c.id AND e.status = 'completed')::INTEGER
+                AS completion_count,
+            (SELECT COALESCE(sum(l.duration), 0) FROM lessons l WHERE l.course_id = c.id)::INTEGER AS total_duration
+        FROM courses c
+        WHERE p_course_ids IS NULL OR c.id = ANY(p_course_ids)
+    )
+    UPDATE courses c
+    SET lesson_count = a.lesson_count, enrollment_count = a.enrollment_count,
+        completion_count = a.completion_count, total_duration = a.total_duration
+    FROM actual a
+    WHERE c.id = a.id
+      AND (c.lesson_count, c.enrollment_count, c.completion_count, c.total_duration)
+          IS DISTINCT FROM (a.lesson_count, a.enrollment_count, a.completion_count, a.total_duration)
+    RETURNING c.id::BIGINT, c.lesson_count, c.enrollment_count, c.completion_count, c.total_duration;
+$$;
+
+-- Backfill existing courses
+SELECT count(*) FROM reconcile_course_counters();
@@ -0,0 +1,87 @@
+-- Migration: Lesson completion as one transactional function
+-- Date: October 17, 2026
+
+-- complete_lesson(user, lesson) does everything POST /lessons/{id}/complete
+-- used to do in a dozen separate round trips: mark the lesson completed
+-- (awarding 10 points the first time), recompute the enrollment's progress
+-- from courses.lesson_count (migrations/005_course_counters.sql), and on
+-- reaching 100% issue the certificate, the "Course Completed" badge and the
+-- 100 course points. It runs in a single transaction, so a failure part way
+-- leaves nothing half-written. Returns no row when the lesson does not exist.
+CREATE OR REPLACE FUNCTION complete_lesson(p_user_id BIGINT, p_lesson_id BIGINT)
+RETURNS TABLE (course_id BIGINT, first_completion BOOLEAN, progress_percentage INTEGER,
+               status TEXT, certificate JSONB)
+LANGUAGE plpgsql SECURITY INVOKER AS $$
+DECLARE
+    v_course_id BIGINT;
+    v_lesson_title TEXT;
+    v_course_title TEXT;
+    v_total INTEGER;
+    v_done INTEGER;
+    v_first BOOLEAN := FALSE;
+    v_percentage INTEGER;
+    v_status TEXT;
+    v_badge_id BIGINT;
+    v_certificate JSONB;
+BEGIN
+    SELECT l.course_id, l.title INTO v_course_id, v_lesson_title FROM lessons l WHERE l.id = p_lesson_id;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    UPDATE lesson_progress lp
+    SET status = 'completed', is_completed = TRUE, completed_at = NOW()
+    WHERE lp.user_id = p_user_id AND lp.lesson_id = p_lesson_id;
+    IF NOT FOUND THEN
+        INSERT INTO lesson_progress (user_id, course_id, lesson_id, status, is_completed, completed_at)
+        VALUES (p_user_id, v_course_id, p_lesson_id, 'completed', TRUE, NOW());
+        INSERT INTO user_points (user_id, points, reason, earned_date)
+        VALUES (p_user_id, 10, 'Completed lesson: ' || v_lesson_title, NOW());
+        v_first := TRUE;
+    END IF;
+
+    SELECT c.lesson_count, c.title INTO v_total, v_course_title FROM courses c WHERE c.id = v_course_id;
+    IF COALESCE(v_total, 0) > 0 THEN
+        SELECT count(*) INTO v_done FROM lesson_progress lp
+        WHERE lp.user_id = p_user_id AND lp.course_id = v_course_id AND lp.is_completed;
+
+        v_percentage := v_done * 100 / v_total;
+        v_status := CASE WHEN v_percentage = 0 THEN 'not_started'
+                         WHEN v_percentage = 100 THEN 'completed'
+                         ELSE 'in_progress' END;
+
+        UPDATE enrollments e
+        SET progress_percentage = v_percentage, status = v_status,
+            completion_date = CASE WHEN v_status = 'completed' THEN NOW() END
+        WHERE e.user_id = p_user_id AND e.course_id = v_course_id;
+
+        IF v_percentage = 100 AND NOT EXISTS (
+            SELECT 1 FROM certificates ct WHERE ct.user_id = p_user_id AND ct.course_id = v_course_id
+        ) THEN
+            INSERT INTO certificates (user_id, course_id, certificate_number, issued_date, grade)
+            VALUES (p_user_id, v_course_id,
+                    'CERT-' || p_user_id || '-' || v_course_id || '-' || extract(epoch FROM NOW())::BIGINT, NOW(), 'A');
+
+            SELECT b.id INTO v_badge_id FROM badges b WHERE b.name = 'Course Completed' LIMIT 1;
+            IF v_badge_id IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM user_badges ub WHERE ub.user_id = p_user_id AND ub.badge_id = v_badge_id
+            ) THEN
+                INSERT INTO user_badges (user_id, badge_id, earned_date) VALUES (p_user_id, v_badge_id, NOW());
+            END IF;
+
+            INSERT INTO user_points (user_id, points, reason, earned_date)
+            VALUES (p_user_id, 100, 'Completed course: ' || v_course_title, NOW());
+        END IF;
+    END IF;
+
+    -- The enrollment as stored (NULL when the learner is not enrolled)
+    SELECT e.progress_percentage, e.status INTO v_percentage, v_status FROM enrollments e
+    WHERE e.user_id = p_user_id AND e.course_id = v_course_id LIMIT 1;
+    IF v_percentage = 100 THEN
+        SELECT to_jsonb(ct) INTO v_certificate FROM certificates ct
+        WHERE ct.user_id = p_user_id AND ct.course_id = v_course_id LIMIT 1;
+    END IF;
+
+    RETURN QUERY SELECT v_course_id, v_first, v_percentage, v_status, v_certificate;
+END;
+$$;
@@ -0,0 +1,114 @@
+-- Migration: Natural-key unique constraints for idempotent upserts
+-- Date: October 17, 2026
+
+-- One progress row per (user, lesson), one enrollment and one review per
+-- (user, course). The data layer writes these with INSERT ... ON CONFLICT
+-- on exactly these keys (Repository.upsert), so double-clicks and retries
+-- cannot create duplicates. Existing duplicates are removed first, keeping
+-- the most advanced progress/enrollment row and the newest review; the
+-- enrollment counter triggers (005) adjust the course counters as they go.
+DELETE FROM lesson_progress lp USING (
+    SELECT id, row_number() OVER (
+        PARTITION BY user_id, lesson_id
+        ORDER BY is_completed DESC, completed_at DESC NULLS LAST, id DESC) AS rank
+    FROM lesson_progress
+) d WHERE lp.id = d.id AND d.rank > 1;
+
+DELETE FROM enrollments e USING (
+    SELECT id, row_number() OVER (
+        PARTITION BY user_id, course_id
+        ORDER BY progress_percentage DESC NULLS LAST, id) AS rank
+    FROM enrollments
+) d WHERE e.id = d.id AND d.rank > 1;
+
+DELETE FROM course_reviews r USING (
+    SELECT id, row_number() OVER (
+        PARTITION BY user_id, course_id
+        ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id DESC) AS rank
+    FROM course_reviews
+) d WHERE r.id = d.id AND d.rank > 1;
+
+-- Unique indexes serve as ON CONFLICT arbiters just like constraints, and
+-- IF NOT EXISTS keeps the migration re-runnable
+CREATE UNIQUE INDEX IF NOT EXISTS uq_lesson_progress_user_lesson ON lesson_progress(user_id, lesson_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_enrollments_user_course ON enrollments(user_id, course_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_course_reviews_user_course ON course_reviews(user_id, course_id);
+
+-- complete_lesson (006) writes its progress row with ON CONFLICT too, so two
+-- concurrent completions of one lesson no longer race to insert
+CREATE OR REPLACE FUNCTION complete_lesson(p_user_id BIGINT, p_lesson_id BIGINT)
+RETURNS TABLE (course_id BIGINT, first_completion BOOLEAN, progress_percentage INTEGER,
+               status TEXT, certificate JSONB)
+LANGUAGE plpgsql SECURITY INVOKER AS $$
+DECLARE
+    v_course_id BIGINT;
+    v_lesson_title TEXT;
+    v_course_title TEXT;
+    v_total INTEGER;
+    v_done INTEGER;
+    v_first BOOLEAN;
+    v_percentage INTEGER;
+    v_status TEXT;
+    v_badge_id BIGINT;
+    v_certificate JSONB;
+BEGIN
+    SELECT l.course_id, l.title INTO v_course_id, v_lesson_title FROM lessons l WHERE l.id = p_lesson_id;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    -- xmax = 0 only on a freshly inserted row: points for the first completion
+    INSERT INTO lesson_progress AS lp (user_id, course_id, lesson_id, status, is_completed, completed_at)
+    VALUES (p_user_id, v_course_id, p_lesson_id, 'completed', TRUE, NOW())
+    ON CONFLICT (user_id, lesson_id) DO UPDATE SET status = 'completed', is_completed = TRUE, completed_at = NOW()
+    RETURNING (lp.xmax = 0) INTO v_first;
+    IF v_first THEN
+        INSERT INTO user_points (user_id, points, reason, earned_date)
+        VALUES (p_user_id, 10, 'Completed lesson: ' || v_lesson_title, NOW());
+    END IF;
+
+    SELECT c.lesson_count, c.title INTO v_total, v_course_title FROM courses c WHERE c.id = v_course_id;
+    IF COALESCE(v_total, 0) > 0 THEN
+        SELECT count(*) INTO v_done FROM lesson_progress lp
+        WHERE lp.user_id = p_user_id AND lp.course_id = v_course_id AND lp.is_completed;
+
+        v_percentage := v_done * 100 / v_total;
+        v_status := CASE WHEN v_percentage = 0 THEN 'not_started'
+                         WHEN v_percentage = 100 THEN 'completed'
+                         ELSE 'in_progress' END;
+
+        UPDATE enrollments e
+        SET progress_percentage = v_percentage, status = v_status,
+            completion_date = CASE WHEN v_status = 'completed' THEN NOW() END
+        WHERE e.user_id = p_user_id AND e.course_id = v_course_id;
+
+        IF v_percentage = 100 AND NOT EXISTS (
+            SELECT 1 FROM certificates ct WHERE ct.user_id = p_user_id AND ct.course_id = v_course_id
+        ) THEN
+            INSERT INTO certificates (user_id, course_id, certificate_number, issued_date, grade)
+            VALUES (p_user_id, v_course_id,
+                    'CERT-' || p_user_id || '-' || v_course_id || '-' || extract(epoch FROM NOW())::BIGINT, NOW(), 'A');
+
+            SELECT b.id INTO v_badge_id FROM badges b WHERE b.name = 'Course Completed' LIMIT 1;
+            IF v_badge_id IS NOT NULL AND NOT EXISTS (
+                SELECT 1 FROM user_badges ub WHERE ub.user_id = p_user_id AND ub.badge_id = v_badge_id
+            ) THEN
+                INSERT INTO user_badges (user_id, badge_id, earned_date) VALUES (p_user_id, v_badge_id, NOW());
+            END IF;
+
+            INSERT INTO user_points (user_id, points, reason, earned_date)
+            VALUES (p_user_id, 100, 'Completed course: ' || v_course_title, NOW());
+        END IF;
+    END IF;
+
+    -- The enrollment as stored (NULL when the learner is not enrolled)
+    SELECT e.progress_percentage, e.status INTO v_percentage, v_status FROM enrollments e
+    WHERE e.user_id = p_user_id AND e.course_id = v_course_id LIMIT 1;
+    IF v_percentage = 100 THEN
+        SELECT to_jsonb(ct) INTO v_certificate FROM certificates ct
+        WHERE ct.user_id = p_user_id AND ct.course_id = v_course_id LIMIT 1;
+    END IF;
+
+    RETURN QUERY SELECT v_course_id, v_first, v_percentage, v_status, v_certificate;
+END;
+$$;
@@ -0,0 +1,33 @@
+-- Migration: Indexes for keyset pagination of admin and instructor lists
+-- Date: October 17, 2026
+
+-- Paginated lists are read newest first on (created_at, id) - login logs on
+-- (login_time, id) - starting strictly after the previous page's last row.
+-- With an index in that order (behind the list's equality filter) a page
+-- is an index seek plus `limit` rows, however deep into the list it is.
+CREATE INDEX IF NOT EXISTS idx_users_created_id ON users(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_users_role_created_id ON users(role, created_at DESC, id DESC);
+DROP INDEX IF EXISTS idx_users_role_created;
+CREATE INDEX IF NOT EXISTS idx_courses_created_id ON courses(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_courses_instructor_created_id ON courses(instructor_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_course_reviews_course_created_id ON course_reviews(course_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_instructor_messages_admin_created_id
+    ON instructor_messages(admin_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_admin_messages_admin_created_id ON admin_messages(admin_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_instructor_login_logs_time_id ON instructor_login_logs(login_time DESC, id DESC);
+
+-- user_summaries (004) aggregated whole child tables before joining, which
+-- a LIMIT cannot cut short. Correlated counts are computed only for the rows
+-- a page returns (one index probe each), and the full listing is still a
+-- single query.
+CREATE OR REPLACE VIEW user_summaries WITH (security_invoker = true) AS
+SELECT
+    u.id,
+    u.full_name,
+    u.email,
+    u.role,
+    u.is_approved,
+    u.created_at,
+    (SELECT count(*) FROM enrollments e WHERE e.user_id = u.id) AS enrollment_count,
+    (SELECT count(*) FROM courses c WHERE c.instructor_id = u.id) AS course_count
+FROM users u;
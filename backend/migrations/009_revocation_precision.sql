@@ -0,0 +1,8 @@
+-- Migration: Sub-second precision for user-wide session revocations
+-- Date: October 17, 2026
+
+-- Signed tokens carry their issue time (iat) in fractional epoch seconds, and
+-- a user-wide revocation invalidates tokens issued at or before revoked_at.
+-- In whole seconds, a login in the same second as a "log out everywhere"
+-- was revoked along with the sessions it replaced.
+ALTER TABLE session_revocations ALTER COLUMN revoked_at TYPE DOUBLE PRECISION;
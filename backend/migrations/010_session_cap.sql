@@ -0,0 +1,30 @@
+-- Migration: Per-user session cap enforced in the database
+-- Date: October 17, 2026
+
+-- trim_user_sessions() deletes, for each of p_user_ids, every session past the
+-- user's newest p_max_per_user (by created_at) and returns the deleted tokens
+-- so the caller can drop them from its session cache. The sweeper walks all
+-- users by id in chunks, so users who logged in through another worker, or
+-- before a restart, are capped too. Each call reads only its users' sessions
+-- (one index range per user), so its cost follows the chunk, not the table.
+-- Signed-token sessions are not stored here and are not capped.
+CREATE INDEX IF NOT EXISTS idx_sessions_user_created ON sessions(user_id, created_at DESC, id DESC);
+
+DROP FUNCTION IF EXISTS trim_user_sessions(INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION trim_user_sessions(p_max_per_user INTEGER, p_user_ids BIGINT[])
+RETURNS TABLE (token TEXT)
+LANGUAGE sql AS $$
+    DELETE FROM sessions s
+    USING (
+        SELECT over_cap.id
+        FROM unnest(p_user_ids) AS u(user_id)
+        CROSS JOIN LATERAL (
+            SELECT id FROM sessions
+            WHERE user_id = u.user_id
+            ORDER BY created_at DESC, id DESC
+            OFFSET p_max_per_user
+        ) over_cap
+    ) o
+    WHERE s.id = o.id
+    RETURNING s.token::TEXT;
+$$;
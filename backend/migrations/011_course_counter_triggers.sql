@@ -0,0 +1,68 @@
+-- Migration: Fire course counter triggers only on real changes; race-free reconcile
+-- Date: October 17, 2026
+
+-- UPDATE OF course_id, status fires whenever the column is SET, changed or
+-- not - and every lesson completion sets the enrollment's status, so each
+-- completion also updated (and row-locked) the course. Updates now fire the
+-- triggers only when a counted column actually changes. A WHEN clause cannot
+-- read OLD on INSERT, so updates get triggers of their own.
+DROP TRIGGER IF EXISTS lessons_course_counters ON lessons;
+CREATE TRIGGER lessons_course_counters
+AFTER INSERT OR DELETE ON lessons
+FOR EACH ROW EXECUTE FUNCTION course_lesson_counters();
+
+DROP TRIGGER IF EXISTS lessons_course_counters_update ON lessons;
+CREATE TRIGGER lessons_course_counters_update
+AFTER UPDATE OF course_id, duration ON lessons
+FOR EACH ROW
+WHEN (OLD.course_id IS DISTINCT FROM NEW.course_id OR OLD.duration IS DISTINCT FROM NEW.duration)
+EXECUTE FUNCTION course_lesson_counters();
+
+DROP TRIGGER IF EXISTS enrollments_course_counters ON enrollments;
+CREATE TRIGGER enrollments_course_counters
+AFTER INSERT OR DELETE ON enrollments
+FOR EACH ROW EXECUTE FUNCTION course_enrollment_counters();
+
+DROP TRIGGER IF EXISTS enrollments_course_counters_update ON enrollments;
+CREATE TRIGGER enrollments_course_counters_update
+AFTER UPDATE OF course_id, status ON enrollments
+FOR EACH ROW
+WHEN (OLD.course_id IS DISTINCT FROM NEW.course_id OR OLD.status IS DISTINCT FROM NEW.status)
+EXECUTE FUNCTION course_enrollment_counters();
+
+-- reconcile_course_counters() counted from its statement's snapshot and then
+-- overwrote the course: a trigger increment committed in between was lost,
+-- so the reconciler itself caused drift. It now locks the courses first
+-- (waiting out in-flight counter updates, holding off new ones) and counts
+-- in a second statement; a volatile SQL function takes a fresh snapshot per
+-- statement, so the count sees everything committed before the locks were
+-- granted.
+CREATE OR REPLACE FUNCTION reconcile_course_counters(p_course_ids BIGINT[] DEFAULT NULL)
+RETURNS TABLE (course_id BIGINT, lesson_count INTEGER, enrollment_count INTEGER,
+               completion_count INTEGER, total_duration INTEGER)
+LANGUAGE sql VOLATILE AS $$
+    SELECT c.id FROM courses c
+    WHERE p_course_ids IS NULL OR c.id = ANY(p_course_ids)
+    ORDER BY c.id
+    FOR UPDATE;
+
+    WITH actual AS (
+        SELECT
+            c.id,
+            (SELECT count(*) FROM lessons l WHERE l.course_id = c.id)::INTEGER AS lesson_count,
+            (SELECT count(*) FROM enrollments e WHERE e.course_id = c.id)::INTEGER AS enrollment_count,
+            (SELECT count(*) FROM enrollments e WHERE e.course_id = c.id AND e.status = 'completed')::INTEGER
+                AS completion_count,
+            (SELECT COALESCE(sum(l.duration), 0) FROM lessons l WHERE l.course_id = c.id)::INTEGER AS total_duration
+        FROM courses c
+        WHERE p_course_ids IS NULL OR c.id = ANY(p_course_ids)
+    )
+    UPDATE courses c
+    SET lesson_count = a.lesson_count, enrollment_count = a.enrollment_count,
+        completion_count = a.completion_count, total_duration = a.total_duration
+    FROM actual a
+    WHERE c.id = a.id
+      AND (c.lesson_count, c.enrollment_count, c.completion_count, c.total_duration)
+          IS DISTINCT FROM (a.lesson_count, a.enrollment_count, a.completion_count, a.total_duration)
+    RETURNING c.id::BIGINT, c.lesson_count, c.enrollment_count, c.completion_count, c.total_duration;
+$$;
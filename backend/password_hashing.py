@@ -0,0 +1,187 @@
+"""
+Password hashing service for LearnSphere
+
+bcrypt is deliberately slow, so hashing and verification run in a process
+pool instead of on the event loop. The number of outstanding jobs is
+capped; once the queue is full new requests are shed with HTTP 503 and a
+Retry-After estimate instead of piling up behind a login storm.
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+from fastapi import HTTPException
+
+import metrics
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", str(PASSWORD_HASH_WORKERS * 8)))
+PASSWORD_BCRYPT_ROUNDS = os.environ.get("PASSWORD_BCRYPT_ROUNDS")
+PASSWORD_VERIFY_TARGET_MS = os.environ.get("PASSWORD_VERIFY_TARGET_MS")
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+DEFAULT_ROUNDS = 12
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+hash_latency = metrics.histogram(
+    "password_hash_seconds", "Time spent inside bcrypt per operation", HASH_BUCKETS)
+hash_queue_wait = metrics.histogram(
+    "password_hash_queue_wait_seconds", "Time a hashing job waited for a free worker", HASH_BUCKETS)
+hash_rejected = metrics.counter(
+    "password_hash_rejected_total", "Hashing jobs shed because the queue was full")
+hash_pending = metrics.gauge(
+    "password_hash_pending", "Hashing jobs queued or running")
+pool_restarts = metrics.counter(
+    "password_hash_pool_restarts_total", "Hashing pools rebuilt after a worker died")
+
+
+def _hashpw(password: bytes, rounds: int):
+    started = time.time()
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    return hashed, started, time.time() - started
+
+
+def _checkpw(password: bytes, hashed: bytes):
+    started = time.time()
+    ok = bcrypt.checkpw(password, hashed)
+    return ok, started, time.time() - started
+
+
+def cost_of(hashed: str):
+    """bcrypt cost factor stored in a hash ("$2b$12$..." -> 12)"""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def measure_verify(rounds: int, samples: int = 3) -> float:
+    """Median seconds for one bcrypt verify at the given cost on this host"""
+    hashed = bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds))
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.checkpw(b"calibration-password", hashed)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+class PasswordPolicy:
+    """Decides the bcrypt cost for new hashes.
+
+    PASSWORD_BCRYPT_ROUNDS pins the cost. Otherwise, if
+    PASSWORD_VERIFY_TARGET_MS is set, calibrate() picks the highest cost
+    whose verify time on this host stays within the target. Without
+    either, bcrypt's default of 12 is used.
+    """
+
+    def __init__(self, rounds: int = None, target_ms: float = None):
+        self.rounds = rounds or DEFAULT_ROUNDS
+        self.pinned = rounds is not None
+        self.target_ms = target_ms
+
+    def calibrate(self) -> int:
+        if self.pinned or not self.target_ms:
+            return self.rounds
+        # Each extra round doubles the work, so extrapolate from one cheap measurement
+        baseline = measure_verify(MIN_ROUNDS)
+        rounds = MIN_ROUNDS
+        while rounds < MAX_ROUNDS and baseline * 2 ** (rounds + 1 - MIN_ROUNDS) * 1000 <= self.target_ms:
+            rounds += 1
+        self.rounds = rounds
+        print(f"🔑 bcrypt cost calibrated to {rounds} (target {self.target_ms:g} ms, "
+              f"cost {MIN_ROUNDS} takes {baseline * 1000:.1f} ms)")
+        return rounds
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return cost_of(hashed) != self.rounds
+
+
+password_policy = PasswordPolicy(
+    rounds=int(PASSWORD_BCRYPT_ROUNDS) if PASSWORD_BCRYPT_ROUNDS else None,
+    target_ms=float(PASSWORD_VERIFY_TARGET_MS) if PASSWORD_VERIFY_TARGET_MS else None,
+)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_QUEUE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    async def hash(self, password: str, rounds: int = None) -> str:
+        hashed = await self._run("hash", _hashpw, password.encode(), rounds or password_policy.rounds)
+        return hashed.decode()
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return await self._run("verify", _checkpw, password.encode(), hashed.encode())
+        except ValueError:
+            return False  # malformed stored hash
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, operation: str, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                hash_rejected.inc(operation=operation)
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many sign-ins right now, please retry shortly",
+                    headers={"Retry-After": str(self._retry_after())},
+                )
+            self._pending += 1
+            hash_pending.set(self._pending)
+        try:
+            pool = self._executor()
+            submitted = time.time()
+            try:
+                result, started, duration = await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            except BrokenProcessPool:
+                # A worker died (OOM-killed, say) and took the pool with it: rebuild it and retry once
+                pool = self._replace(pool)
+                submitted = time.time()
+                result, started, duration = await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            hash_queue_wait.observe(max(0.0, started - submitted), operation=operation)
+            hash_latency.observe(duration, operation=operation)
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+                hash_pending.set(self._pending)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _replace(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """A fresh pool in place of `broken`; concurrent callers that hit the same broken pool share one"""
+        with self._lock:
+            if self._pool is broken:
+                print("⚠️ Password hashing pool broke (a worker died) - starting a new one")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                pool_restarts.inc()
+            elif self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _retry_after(self) -> int:
+        stats = hash_latency.snapshot().get((("operation", "verify"),))
+        average = stats["sum"] / stats["count"] if stats and stats["count"] else 0.25
+        return max(1, math.ceil(self._pending * average / self.workers))
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,64 @@
+"""
+Column projections for LearnSphere responses
+
+List endpoints select a "card" projection - the columns a course card or
+table row renders - instead of "*", and course pages get a lesson outline
+without lesson bodies (the body is fetched per lesson from
+/api/lessons/{id}). Clients can ask for other columns with
+?fields=title,full_description (validated against the columns the API
+exposes) or ?fields=* for whole rows.
+"""
+
+COURSE_FIELDS = (
+    "id", "instructor_id", "title", "subject_name", "tagline", "short_description", "full_description",
+    "image_url", "video_url", "audio_url", "tags", "visibility", "access", "price", "published",
+    "average_rating", "total_reviews", "lesson_count", "enrollment_count", "completion_count", "total_duration",
+    "created_at",
+)
+
+# Catalog / learner course cards
+COURSE_CARD = (
+    "id", "instructor_id", "title", "subject_name", "tagline", "short_description", "image_url", "tags",
+    "visibility", "access", "price", "average_rating", "total_reviews", "lesson_count", "total_duration",
+    "created_at",
+)
+
+# Admin and instructor course tables
+COURSE_ADMIN_CARD = (
+    "id", "instructor_id", "title", "subject_name", "short_description", "image_url", "tags", "visibility",
+    "access", "price", "published", "average_rating", "total_reviews", "lesson_count", "enrollment_count",
+    "completion_count", "total_duration", "created_at",
+)
+
+# User fields safe to return to the user themselves: what /api/auth/me exposes, never password_hash
+USER_PUBLIC = ("id", "email", "full_name", "role", "is_approved")
+
+# Course page lesson list; no content/description bodies
+LESSON_OUTLINE = ("id", "course_id", "title", "lesson_type", "content_type", "duration", "order_index")
+
+# Always selected: row identity and the keyset pagination column
+REQUIRED = ("id", "created_at")
+
+
+class UnknownFields(ValueError):
+    """?fields= named columns outside the allowed set"""
+
+
+def columns(fields: str, default: tuple, allowed: tuple = COURSE_FIELDS, required: tuple = REQUIRED) -> str:
+    """Select list for a ?fields= value: `default` when empty, "*" for "*", else the requested columns"""
+    if not fields:
+        return ", ".join(default)
+    if fields.strip() == "*":
+        return "*"
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise UnknownFields(f"Unknown fields: {', '.join(unknown)}")
+    return ", ".join(dict.fromkeys(list(required) + requested))
+
+
+def project(row: dict, select: str) -> dict:
+    """A copy of `row` cut down to a select list returned by columns()"""
+    if select == "*":
+        return dict(row)
+    return {c: row.get(c) for c in select.split(", ")}
@@ -0,0 +1,190 @@
+"""
+Per-request database round-trip accounting for LearnSphere
+
+track(client) wraps a data client (sync or async) so every execute() is
+timed and charged to the request being served: query count, DB wall time,
+tables hit and the query's shape - the builder chain without values, e.g.
+"enrollments.select(*).eq(user_id).eq(course_id)". The HTTP middleware
+opens a RequestQueries per request with begin() and reports it with
+observe(), which feeds the Prometheus histograms and the Server-Timing
+header.
+
+NPlusOneDetector flags requests that issue the same query shape
+N_PLUS_ONE_THRESHOLD or more times - a query inside a loop over rows.
+N_PLUS_ONE_MODE is "log" (default, for development), "raise" (tests and
+the CI budget check) or "off".
+"""
+import contextvars
+import inspect
+import os
+import threading
+import time
+
+import metrics
+from data.query import parse_logic, parse_select
+
+queries_per_request = metrics.histogram(
+    "db_queries_per_request", "Database queries issued while serving one request",
+    (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233))
+db_seconds_per_request = metrics.histogram(
+    "db_seconds_per_request", "Database wall time spent while serving one request")
+queries_by_table = metrics.counter(
+    "db_queries_total", "Database queries by route and table (embedded tables included)")
+n_plus_one_flagged = metrics.counter(
+    "db_n_plus_one_total", "Requests that repeated one query shape N_PLUS_ONE_THRESHOLD+ times")
+
+_current = contextvars.ContextVar("request_queries", default=None)
+
+
+class RequestQueries:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.tables = {}  # table -> queries touching it
+        self.shapes = []  # one shape string per query, in issue order
+        self._lock = threading.Lock()  # sync handlers may fan out to threads
+
+    def record(self, tables: list, shape: str, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.shapes.append(shape)
+            for table in tables:
+                self.tables[table] = self.tables.get(table, 0) + 1
+
+    def repeated_shapes(self, threshold: int) -> dict:
+        """{shape: count} for shapes issued at least `threshold` times"""
+        counts = {}
+        for shape in self.shapes:
+            counts[shape] = counts.get(shape, 0) + 1
+        return {shape: count for shape, count in counts.items() if count >= threshold}
+
+    def server_timing(self, total_seconds: float) -> str:
+        noun = "query" if self.count == 1 else "queries"
+        return (f'db;dur={self.seconds * 1000:.1f};desc="{self.count} {noun}", '
+                f'app;dur={total_seconds * 1000:.1f}')
+
+
+def begin():
+    """Start accounting for the current request: (stats, reset token)"""
+    stats = RequestQueries()
+    return stats, _current.set(stats)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def observe(route: str, method: str, stats: RequestQueries):
+    queries_per_request.observe(stats.count, route=route, method=method)
+    db_seconds_per_request.observe(stats.seconds, route=route, method=method)
+    for table, count in stats.tables.items():
+        queries_by_table.inc(count, route=route, table=table)
+
+
+class NPlusOneError(Exception):
+    """A request repeated a query shape; raised in "raise" mode"""
+
+
+class NPlusOneDetector:
+    def __init__(self, mode: str = "log", threshold: int = 3, allowed_routes=()):
+        if mode not in ("off", "log", "raise"):
+            raise ValueError(f"N_PLUS_ONE_MODE must be off, log or raise, not {mode!r}")
+        self.mode = mode
+        self.threshold = threshold
+        self.allowed_routes = set(allowed_routes)  # "GET /api/..." known offenders
+
+    def check(self, route: str, method: str, stats: RequestQueries):
+        if self.mode == "off" or f"{method} {route}" in self.allowed_routes:
+            return
+        repeated = stats.repeated_shapes(self.threshold)
+        if not repeated:
+            return
+        n_plus_one_flagged.inc(route=route)
+        detail = "; ".join(f"{count}x {shape}" for shape, count in sorted(repeated.items(), key=lambda i: -i[1]))
+        message = f"N+1 queries in {method} {route}: {detail}"
+        if self.mode == "raise":
+            raise NPlusOneError(message)
+        print(f"⚠️ {message}")
+
+
+n_plus_one = NPlusOneDetector(os.environ.get("N_PLUS_ONE_MODE", "log"),
+                              int(os.environ.get("N_PLUS_ONE_THRESHOLD", "3")))
+
+
+def _logic_columns(filters: list) -> list:
+    """Columns of a parsed or_() tree, without its values, for the query shape"""
+    columns = []
+    for column, op, value in filters:
+        for name in (_logic_columns(value) if op in ("and", "or", "not") else [column]):
+            if name not in columns:
+                columns.append(name)
+    return columns
+
+
+class TrackedBuilder:
+    """Proxy for a query builder that records its chain and times execute()"""
+
+    def __init__(self, builder, tables: list, shape: str):
+        self._builder = builder
+        self._tables = tables
+        self._shape = shape
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            tables, step = self._tables, name
+            if name == "or_":
+                step = f"or_({','.join(_logic_columns(parse_logic(args[0])))})"
+            elif args and isinstance(args[0], str):
+                step = f"{name}({args[0]})"
+                if name == "select":
+                    tables = tables + [e.table for e in parse_select(",".join(args)).embeds]
+            return TrackedBuilder(attr(*args, **kwargs), tables, f"{self._shape}.{step}")
+        return call
+
+    def execute(self):
+        stats = _current.get()
+        if stats is None:
+            return self._builder.execute()
+        started = time.perf_counter()
+        result = self._builder.execute()
+        if inspect.isawaitable(result):
+            return self._finish(result, stats, started)
+        stats.record(self._tables, self._shape, time.perf_counter() - started)
+        return result
+
+    async def _finish(self, pending, stats: RequestQueries, started: float):
+        try:
+            return await pending
+        finally:
+            stats.record(self._tables, self._shape, time.perf_counter() - started)
+
+
+class TrackedClient:
+    """Data client proxy whose table() builders are tracked"""
+
+    def __init__(self, client):
+        self._client = client
+        self.is_async = getattr(client, "is_async", False)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def table(self, name: str) -> TrackedBuilder:
+        return TrackedBuilder(self._client.table(name), [name], name)
+
+    def rpc(self, name: str, params: dict = None) -> TrackedBuilder:
+        table = (params or {}).get("p_table")
+        return TrackedBuilder(self._client.rpc(name, params or {}), [table] if table else [], f"rpc.{name}")
+
+
+def track(client) -> TrackedClient:
+    return TrackedClient(client)
@@ -0,0 +1,105 @@
+"""
+Read-through cache for hot public reads, with single-flight and stale-while-revalidate
+
+cache.get(key, fetch) returns the cached value for `key`, or awaits
+fetch() to produce it. Three properties keep a burst of identical requests
+from turning into a burst of identical queries:
+
+- single flight: at most one fetch per key is in flight; concurrent misses
+  await the same task instead of each querying ("coalesced");
+- stale-while-revalidate: for `stale_ttl` seconds after an entry goes
+  stale it is still served at once while one background fetch refreshes it;
+- invalidate(*prefix) drops the matching entries and in-flight fetches,
+  and a fetch that started before an invalidation of its key is not
+  stored, so writes are visible to the next read in this process. Fetches
+  for keys outside the prefix are unaffected.
+
+Keys are tuples; invalidate(course_id) drops every key starting with
+course_id. Outcomes are counted in read_cache_requests_total{cache, result}
+with result hit / stale / miss / coalesced.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+READ_CACHE_SIZE = int(os.environ.get("READ_CACHE_SIZE", "2000"))
+
+cache_requests = metrics.counter("read_cache_requests_total", "Read cache lookups by cache and result")
+
+
+class ReadCache:
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_entries: int = READ_CACHE_SIZE):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (fresh until, stale until, value)
+        self._inflight = {}  # key -> asyncio.Task
+        self._generation = 0  # number of invalidate() calls, for stats (and the catalog version)
+        self._lock = threading.Lock()  # invalidate() is also called from sync (threadpool) handlers
+
+    async def get(self, key: tuple, fetch):
+        """The value for `key`, from the cache or from awaiting fetch()"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[1]:
+                self._entries.move_to_end(key)
+                if now < entry[0]:
+                    result = "hit"
+                else:
+                    result = "stale"
+                    if key not in self._inflight:
+                        self._start(key, fetch, refresh=True)
+                cache_requests.inc(cache=self.name, result=result)
+                return entry[2]
+            task = self._inflight.get(key)
+            result = "coalesced" if task is not None else "miss"
+            if task is None:
+                task = self._start(key, fetch)
+        cache_requests.inc(cache=self.name, result=result)
+        # shield: a client disconnecting must not cancel the fetch other requests are waiting on
+        return await asyncio.shield(task)
+
+    def invalidate(self, *prefix):
+        """Drop entries (and forget in-flight fetches) whose key starts with `prefix`; everything without one"""
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._entries if k[:len(prefix)] == prefix]:
+                del self._entries[key]
+            for key in [k for k in self._inflight if k[:len(prefix)] == prefix]:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "inflight": len(self._inflight), "generation": self._generation}
+
+    def _start(self, key: tuple, fetch, refresh: bool = False) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fill(key, fetch))
+        task.add_done_callback(lambda done: self._finished(key, done, refresh))
+        self._inflight[key] = task
+        return task
+
+    async def _fill(self, key: tuple, fetch):
+        value = await fetch()
+        with self._lock:
+            # invalidate() forgets the in-flight fetches it covers: store only if this one is still current
+            if self._inflight.get(key) is asyncio.current_task() and self.ttl > 0:
+                now = time.monotonic()
+                self._entries[key] = (now + self.ttl, now + self.ttl + self.stale_ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def _finished(self, key: tuple, task: asyncio.Task, refresh: bool):
+        with self._lock:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+        error = None if task.cancelled() else task.exception()  # also marks the exception retrieved
+        if error is not None and refresh:
+            print(f"⚠️ {self.name} cache refresh of {key} failed: {error}")
@@ -0,0 +1,144 @@
+"""
+Response encoding for LearnSphere: orjson bodies and negotiated compression
+
+FastJSONResponse is the app's default response class. It renders with
+orjson (several times faster than jsonable_encoder + json.dumps, and it
+encodes datetimes natively). FastAPI still walks a returned dict through
+jsonable_encoder before rendering, so the big listing endpoints return
+json_response(...) directly to skip that pass. Bodies that are rendered
+ahead of time (the catalog snapshots) go out through cached_json(), which
+adds an ETag and answers If-None-Match revalidations with 304.
+
+CompressionMiddleware compresses responses of at least COMPRESS_MIN_BYTES
+with brotli (when the `brotli` package is installed) or gzip, whichever
+the client's Accept-Encoding prefers. Smaller bodies go out as they are,
+because there compression costs more CPU than it saves on the wire.
+"""
+import hashlib
+import json
+import os
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", "4"))
+
+
+def _default(value):
+    """Types orjson does not encode itself: DECIMAL columns from psycopg2, anything else via jsonable_encoder"""
+    if isinstance(value, Decimal):
+        return float(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def json_response(content, status_code: int = 200, headers: dict = None) -> FastJSONResponse:
+    """Render `content` straight to JSON, skipping FastAPI's jsonable_encoder pass"""
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def etag_for(body: bytes) -> str:
+    """Weak ETag of a JSON body (weak, since the compression middleware may re-encode it)"""
+    return 'W/"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match weak comparison: any listed tag equal to `etag` ignoring W/, or *"""
+    tags = [tag.strip() for tag in if_none_match.split(",") if tag.strip()]
+    return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+
+
+def cached_json(request, body: bytes, etag: str = None, private: bool = False, headers: dict = None) -> Response:
+    """A pre-rendered JSON body with its ETag, or 304 Not Modified when If-None-Match already has it.
+    `private` keeps shared caches from storing a per-user body"""
+    etag = etag or etag_for(body)
+    headers = dict(headers or {}, ETag=etag)
+    headers["Cache-Control"] = "private, no-cache" if private else "no-cache"
+    if etag_matches(request.headers.get("If-None-Match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def negotiate(accept_encoding: str) -> str:
+    """The supported encoding the client ranks highest ("br", "gzip" or "identity"); brotli wins ties"""
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    explicit, wildcard = {}, 0.0
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        try:
+            q = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            q = 0.0
+        if coding.strip() == "*":
+            wildcard = q
+        else:
+            explicit[coding.strip()] = q
+    ranked = [(explicit.get(coding, wildcard), coding) for coding in supported]
+    q, coding = max(ranked, key=lambda pair: pair[0])  # max() keeps the first of equal q's
+    return coding if q > 0 else "identity"
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int = BROTLI_QUALITY, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """gzip / brotli above `minimum_size` bytes, chosen from the request's Accept-Encoding"""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES, compresslevel: int = GZIP_LEVEL,
+                 brotli_quality: int = BROTLI_QUALITY, **kwargs):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel, **kwargs)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("Accept-Encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality,
+                                        exclude_content_types=self.exclude_content_types)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel,
+                                      thread_minimum_size=self.thread_minimum_size,
+                                      exclude_content_types=self.exclude_content_types)
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+        await responder(scope, receive, send)
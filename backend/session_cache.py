@@ -0,0 +1,104 @@
+"""
+Session cache for LearnSphere - bounded TTL/LRU cache of resolved sessions
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+SESSION_CACHE_TTL = int(os.environ.get("SESSION_CACHE_TTL", "60"))
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", "10000"))
+
+
+def hash_token(token: str) -> str:
+    """Cache key for a session token (raw tokens are never kept in memory)"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionCache:
+    """In-process cache of token hash -> user dict.
+
+    Entries expire after `ttl` seconds or when the session itself expires,
+    whichever comes first. The least recently used entry is evicted once
+    `max_entries` is reached.
+    """
+
+    def __init__(self, ttl: int = SESSION_CACHE_TTL, max_entries: int = SESSION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # token hash -> (deadline, user)
+        self._by_user = {}  # user id -> set of token hashes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str):
+        key = hash_token(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            deadline, user = entry
+            if deadline <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(user)
+
+    def set(self, token: str, user: dict, expires_at: str = None):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        deadline = time.monotonic() + self.ttl
+        if expires_at:
+            try:
+                remaining = (datetime.fromisoformat(expires_at.replace('Z', '+00:00')) - datetime.now(timezone.utc)).total_seconds()
+                deadline = min(deadline, time.monotonic() + remaining)
+            except (ValueError, TypeError):
+                pass
+        key = hash_token(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (deadline, dict(user))
+            self._by_user.setdefault(user["id"], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, token: str):
+        """Drop a single session (logout)"""
+        with self._lock:
+            self._remove(hash_token(token))
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached session of a user (approval or role changes)"""
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1]["id"]
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+
+session_cache = SessionCache()
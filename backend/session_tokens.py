@@ -0,0 +1,157 @@
+"""
+Signed session tokens for LearnSphere
+
+With SESSION_TOKEN_MODE=signed the session cookie is an HMAC-SHA256 signed
+payload carrying the user's id, role, approval flag and expiry, so it can
+be verified without a database lookup. Revocations (logout, instructor
+approval changes) are written to the session_revocations table and kept
+in memory as a small set that is refreshed in bulk.
+
+Signed mode will not start without SESSION_SIGNING_KEY, and signed tokens
+are only accepted in signed mode: in the default db mode every cookie is
+looked up in the sessions table.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+
+SESSION_TOKEN_MODE = os.environ.get("SESSION_TOKEN_MODE", "db")
+SESSION_SIGNING_KEY = os.environ.get("SESSION_SIGNING_KEY", "")
+REVOCATION_REFRESH_SECONDS = int(os.environ.get("SESSION_REVOCATION_REFRESH", "30"))
+SESSION_LIFETIME = 30 * 24 * 3600
+
+if SESSION_TOKEN_MODE == "signed" and not SESSION_SIGNING_KEY:
+    raise RuntimeError("SESSION_TOKEN_MODE=signed requires SESSION_SIGNING_KEY")
+
+
+def signed_mode() -> bool:
+    return SESSION_TOKEN_MODE == "signed"
+
+
+def is_signed_token(token: str) -> bool:
+    """A signed-mode token; in db mode nothing is, so every cookie goes through the sessions table"""
+    # token_urlsafe() never produces '.', so legacy database tokens keep working
+    return signed_mode() and "." in token
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(body: str) -> str:
+    return _b64encode(hmac.new(SESSION_SIGNING_KEY.encode(), body.encode(), hashlib.sha256).digest())
+
+
+def issue_token(user: dict, lifetime: int = SESSION_LIFETIME) -> str:
+    now = time.time()
+    payload = {
+        "sid": secrets.token_urlsafe(12),
+        "uid": user["id"],
+        "email": user["email"],
+        "name": user["full_name"],
+        "role": user["role"],
+        "ok": bool(user.get("is_approved", True)),
+        "iat": now,  # sub-second, so a revocation in the same second doesn't catch later logins
+        "exp": int(now) + lifetime,
+    }
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{body}.{_sign(body)}"
+
+
+def decode_token(token: str):
+    """Return the payload of a well-formed, correctly signed, unexpired token"""
+    if not SESSION_SIGNING_KEY:
+        return None  # never accept tokens signed with an empty key
+    try:
+        body, signature = token.split(".", 1)
+        if not hmac.compare_digest(signature, _sign(body)):
+            return None
+        payload = json.loads(_b64decode(body))
+    except (ValueError, TypeError):
+        return None
+    if payload.get("exp", 0) <= time.time():
+        return None
+    return payload
+
+
+class RevocationList:
+    """Revoked session ids plus per-user "revoked before" cut-offs.
+
+    `loader` returns the current rows of session_revocations; it is called
+    at most once per `refresh_interval` seconds, on a background thread.
+    """
+
+    def __init__(self, loader=None, refresh_interval: int = REVOCATION_REFRESH_SECONDS):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._sessions = {}  # session id -> token expiry
+        self._users = {}  # user id -> revoked-at timestamp (fractional seconds)
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def is_revoked(self, payload: dict) -> bool:
+        self._maybe_refresh()
+        if payload["sid"] in self._sessions:
+            return True
+        cutoff = self._users.get(payload["uid"])
+        return cutoff is not None and payload["iat"] <= cutoff
+
+    def revoke_session(self, payload: dict):
+        with self._lock:
+            self._sessions[payload["sid"]] = payload["exp"]
+
+    def revoke_user(self, user_id: int, revoked_at: float = None):
+        revoked_at = revoked_at or time.time()
+        with self._lock:
+            self._users[user_id] = max(self._users.get(user_id, 0), revoked_at)
+
+    def refresh(self):
+        """Merge the stored revocations into the in-memory ones and drop what has expired.
+
+        Merging (rather than replacing) keeps revocations made in this process
+        while the load was running, before they were visible in the table.
+        """
+        if self.loader is None:
+            return
+        rows = self.loader()
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                if row.get("session_id"):
+                    self._sessions[row["session_id"]] = row["expires_at"]
+                else:
+                    self._users[row["user_id"]] = max(self._users.get(row["user_id"], 0), row["revoked_at"])
+            # A token outlives neither its own expiry nor SESSION_LIFETIME past a user-wide cut-off
+            self._sessions = {sid: exp for sid, exp in self._sessions.items() if exp > now}
+            self._users = {uid: at for uid, at in self._users.items() if at + SESSION_LIFETIME > now}
+            self._loaded_at = now
+
+    def _maybe_refresh(self):
+        """Start a background refresh once the set is older than refresh_interval; callers keep
+        checking against the current set meanwhile, so a request never waits on the load"""
+        with self._lock:
+            if self._refreshing or time.time() - self._loaded_at < self.refresh_interval:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, name="revocation-refresh", daemon=True).start()
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error refreshing session revocations: {e}")
+            with self._lock:
+                self._loaded_at = time.time()  # try again after refresh_interval, not on every request
+        finally:
+            with self._lock:
+                self._refreshing = False
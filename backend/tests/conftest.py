@@ -0,0 +1,45 @@
+"""
+Shared fixtures: the app on the seeded in-memory backend (see data/seed.py)
+
+Run from backend/ with `python -m pytest -q`. Nothing here talks to Supabase.
+"""
+import os
+import sys
+
+os.environ["DATA_BACKEND"] = "memory"
+os.environ["SESSION_TOKEN_MODE"] = "db"
+os.environ.setdefault("MEMORY_SEED_SCALE", "1")
+os.environ.setdefault("SESSION_SWEEP_INTERVAL", "0")
+os.environ.setdefault("COUNTER_RECONCILE_INTERVAL", "0")
+os.environ.setdefault("AUDIT_FLUSH_SECONDS", "0.05")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+USERS = {
+    "learner": "learner@test.com",
+    "admin": "admin@test.com",
+    "instructor": "instructor@test.com",
+}
+
+
+@pytest.fixture(scope="session")
+def app():
+    """main_new.app with its startup hooks run once for the whole test session"""
+    import main_new
+
+    with TestClient(main_new.app):
+        yield main_new
+
+
+@pytest.fixture
+def client_for(app):
+    """client_for(role): a fresh client logged in as the seeded user of that role"""
+    def login(role: str) -> TestClient:
+        client = TestClient(app.app)
+        response = client.post("/api/auth/login", json={"email": USERS[role], "password": "password123"})
+        assert response.status_code == 200, response.text
+        return client
+    return login
@@ -0,0 +1,102 @@
+"""Lesson bootstrap and learner dashboard against the seeded memory backend"""
+import pytest
+
+from course_bundles import course_bundles
+
+
+def user_id(app, email: str) -> int:
+    return app.db.table("users").select("id").eq("email", email).execute().data[0]["id"]
+
+
+def enrolled_course_ids(app, email: str) -> set:
+    rows = app.db.table("enrollments").select("course_id").eq("user_id", user_id(app, email)).execute().data
+    return {row["course_id"] for row in rows}
+
+
+def first_lesson(app, course_id: int) -> dict:
+    return app.db.table("lessons").select("*").eq("course_id", course_id).order("order_index").execute().data[0]
+
+
+@pytest.fixture
+def owned_courses(app):
+    """Two courses of the demo instructor, the first one with the learner enrolled"""
+    owned = [row["id"] for row in app.db.table("courses").select("id").eq(
+        "instructor_id", user_id(app, "instructor@test.com")).execute().data]
+    enrolled = enrolled_course_ids(app, "learner@test.com")
+    source = next(c for c in owned if c in enrolled)
+    return source, next(c for c in owned if c != source)
+
+
+def test_bootstrap_unknown_lesson_is_404(client_for):
+    assert client_for("learner").post("/api/learner/lessons/999999/bootstrap").status_code == 404
+
+
+def test_bootstrap_without_access_returns_only_the_outline(app, client_for):
+    enrolled = enrolled_course_ids(app, "learner@test.com")
+    course_id = next(row["id"] for row in app.db.table("courses").select("id").execute().data if row["id"] not in enrolled)
+    lesson = first_lesson(app, course_id)
+
+    data = client_for("learner").post(f"/api/learner/lessons/{lesson['id']}/bootstrap").json()
+
+    assert data["access"] == {"has_access": False, "reason": "not_enrolled"}
+    assert data["lesson"]["id"] == lesson["id"] and "content" not in data["lesson"]
+    assert data["attachments"] == []
+
+
+def test_bootstrap_follows_a_moved_lesson(app, client_for, owned_courses):
+    source, target = owned_courses
+    lesson = first_lesson(app, source)
+    learner, instructor = client_for("learner"), client_for("instructor")
+    assert learner.post(f"/api/learner/lessons/{lesson['id']}/bootstrap").json()["course"]["id"] == source
+
+    try:
+        moved = instructor.put(f"/api/instructor/lessons/{lesson['id']}", json={"course_id": target})
+        assert moved.status_code == 200
+
+        bootstrap = learner.post(f"/api/learner/lessons/{lesson['id']}/bootstrap")
+        assert bootstrap.status_code == 200
+        assert bootstrap.json()["course"]["id"] == target
+        assert learner.get(f"/api/lessons/{lesson['id']}").json()["lesson"]["course_id"] == target
+    finally:
+        instructor.put(f"/api/instructor/lessons/{lesson['id']}", json={"course_id": source})
+
+
+def test_bootstrap_recovers_from_a_stale_lesson_map(app, client_for, owned_courses):
+    source, target = owned_courses
+    lesson = first_lesson(app, source)
+    course_bundles.remember(lesson["id"], target)  # as if another worker had moved it back
+
+    bootstrap = client_for("learner").post(f"/api/learner/lessons/{lesson['id']}/bootstrap")
+
+    assert bootstrap.status_code == 200
+    assert bootstrap.json()["course"]["id"] == source
+    assert course_bundles.course_of(lesson["id"]) == source
+
+
+def test_instructor_cannot_move_a_lesson_into_a_foreign_course(app, client_for, owned_courses):
+    source, _ = owned_courses
+    lesson = first_lesson(app, source)
+    foreign = app.db.table("courses").select("id").neq("instructor_id", user_id(app, "instructor@test.com")).limit(1).execute().data[0]
+
+    moved = client_for("instructor").put(f"/api/instructor/lessons/{lesson['id']}", json={"course_id": foreign["id"]})
+
+    assert moved.status_code == 403
+
+
+def test_dashboard_never_returns_the_password_hash(client_for):
+    learner = client_for("learner")
+
+    assert "password_hash" not in learner.get("/api/learner/dashboard").json()["profile"]
+    assert "password_hash" not in learner.get("/api/learner/profile").json()["profile"]
+
+
+def test_dashboard_matches_the_endpoints_it_replaces(client_for):
+    learner = client_for("learner")
+
+    dashboard = learner.get("/api/learner/dashboard").json()
+    achievements = learner.get("/api/learner/achievements").json()
+
+    assert dashboard["profile"] == learner.get("/api/learner/profile").json()["profile"]
+    assert dashboard["points"] == achievements["points"]
+    assert dashboard["badges"] == achievements["badges"]
+    assert dashboard["streak"] == achievements["streak"]
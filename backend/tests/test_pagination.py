@@ -0,0 +1,53 @@
+import pytest
+
+from data.memory import MemoryBackend
+from data.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset, merge, page
+
+T = "2026-01-01T00:00:00"
+
+
+def walk(fetch, limit: int = 2) -> list:
+    rows, cursor = [], None
+    while True:
+        batch, cursor = page(fetch(cursor), limit)
+        rows += batch
+        if not cursor:
+            return rows
+
+
+@pytest.fixture
+def backend():
+    backend = MemoryBackend()
+    for i in range(5):
+        for table in ("instructor_messages", "admin_messages"):
+            backend.table(table).insert({"admin_id": 1, "created_at": None if i < 2 else T}).execute()
+    return backend
+
+
+def test_null_timestamps_are_paged_first_and_once(backend):
+    rows = walk(lambda cursor: keyset(backend.table("instructor_messages").select("*"), cursor, 2).execute().data)
+
+    assert [(r["created_at"], r["id"]) for r in rows] == [(None, 2), (None, 1), (T, 5), (T, 4), (T, 3)]
+
+
+def test_merged_listing_pages_every_row_once(backend):
+    tables = ("instructor_messages", "admin_messages")
+
+    def fetch(cursor):
+        return merge({t: keyset(backend.table(t).select("*"), cursor, 3, source=t).execute().data for t in tables})
+
+    rows = walk(fetch, limit=3)
+    everything = [row for _, row in merge({t: backend.table(t).select("*").execute().data for t in tables})]
+
+    assert rows == everything and len(rows) == 10
+
+
+def test_cursor_kinds_are_not_interchangeable():
+    row = {"created_at": T, "id": 3}
+
+    assert decode_cursor(encode_cursor(row)) == (T, None, 3)
+    assert decode_cursor(encode_cursor(row, source="admin_messages"), merged=True) == (T, "admin_messages", 3)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(row), merged=True)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(row, source="admin_messages"))
@@ -0,0 +1,63 @@
+import asyncio
+
+from read_cache import ReadCache
+
+
+def fetcher(calls: list, value, delay: float = 0.02):
+    async def fetch():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return fetch
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def run():
+        cache, calls = ReadCache("test", ttl=60), []
+        results = await asyncio.gather(*(cache.get(("k",), fetcher(calls, "v")) for _ in range(10)))
+        return results, calls
+
+    results, calls = asyncio.run(run())
+
+    assert results == ["v"] * 10
+    assert calls == ["v"]
+
+
+def test_invalidate_drops_only_the_matching_prefix():
+    async def run():
+        cache, calls = ReadCache("test", ttl=60), []
+        await cache.get((1, "a"), fetcher(calls, "1a"))
+        await cache.get((2, "a"), fetcher(calls, "2a"))
+        cache.invalidate(1)
+        return await cache.get((1, "a"), fetcher(calls, "1a'")), await cache.get((2, "a"), fetcher(calls, "2a'"))
+
+    assert asyncio.run(run()) == ("1a'", "2a")
+
+
+def test_invalidation_discards_only_the_fills_it_covers():
+    async def run():
+        cache, calls = ReadCache("test", ttl=60), []
+        one = asyncio.ensure_future(cache.get((1,), fetcher(calls, "old")))
+        two = asyncio.ensure_future(cache.get((2,), fetcher(calls, "two")))
+        await asyncio.sleep(0.005)
+        cache.invalidate(1)  # a write to key 1 while both fetches are in flight
+        await asyncio.gather(one, two)
+        return await cache.get((1,), fetcher(calls, "new")), await cache.get((2,), fetcher(calls, "two'"))
+
+    assert asyncio.run(run()) == ("new", "two")
+
+
+def test_stale_entry_is_served_while_one_refresh_runs():
+    async def run():
+        cache, calls = ReadCache("test", ttl=0.05, stale_ttl=60), []
+        await cache.get(("k",), fetcher(calls, "v1"))
+        await asyncio.sleep(0.1)
+        served = [await cache.get(("k",), fetcher(calls, "v2")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        return served, await cache.get(("k",), fetcher(calls, "v3")), calls
+
+    served, refreshed, calls = asyncio.run(run())
+
+    assert served == ["v1"] * 3
+    assert refreshed == "v2"
+    assert calls == ["v1", "v2"]
@@ -0,0 +1,67 @@
+import time
+
+from session_cache import SessionCache, hash_token
+
+USER = {"id": 7, "email": "a@test.com", "full_name": "A", "role": "learner", "is_approved": True}
+
+
+def test_get_returns_a_copy_and_keys_by_hash():
+    cache = SessionCache(ttl=60)
+    cache.set("token", USER)
+
+    user = cache.get("token")
+    user["role"] = "admin"
+
+    assert cache.get("token")["role"] == "learner"
+    assert "token" not in cache._entries and hash_token("token") in cache._entries
+
+
+def test_entries_expire_with_the_session():
+    cache = SessionCache(ttl=60)
+    cache.set("token", USER, expires_at="2000-01-01T00:00:00Z")
+
+    assert cache.get("token") is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = SessionCache(ttl=1)
+    cache.set("token", USER)
+    later = time.monotonic() + 2
+    monkeypatch.setattr(time, "monotonic", lambda: later)
+
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SessionCache(ttl=60, max_entries=2)
+    cache.set("a", USER)
+    cache.set("b", dict(USER, id=8))
+    cache.get("a")
+    cache.set("c", dict(USER, id=9))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_invalidate_user_drops_every_session_of_that_user():
+    cache = SessionCache(ttl=60)
+    cache.set("a", USER)
+    cache.set("b", USER)
+    cache.set("c", dict(USER, id=8))
+
+    cache.invalidate_user(7)
+
+    assert cache.get("a") is None and cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_logout_is_seen_by_the_next_request(client_for):
+    client = client_for("learner")
+    assert client.get("/api/auth/me").json()["user"]["email"] == "learner@test.com"
+    assert client.get("/api/auth/me").json()["user"] is not None  # served from the cache
+
+    token = client.cookies.get("session_token")
+    client.post("/api/auth/logout")
+    client.cookies.set("session_token", token)
+
+    assert client.get("/api/auth/me").json()["user"] is None
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+import session_tokens
+from session_tokens import RevocationList, decode_token, is_signed_token, issue_token
+
+USER = {"id": 7, "email": "a@test.com", "full_name": "A", "role": "learner", "is_approved": True}
+
+
+@pytest.fixture
+def signed(monkeypatch):
+    monkeypatch.setattr(session_tokens, "SESSION_TOKEN_MODE", "signed")
+    monkeypatch.setattr(session_tokens, "SESSION_SIGNING_KEY", "test-key")
+
+
+def test_signed_token_round_trip(signed):
+    token = issue_token(USER)
+
+    payload = decode_token(token)
+
+    assert is_signed_token(token)
+    assert (payload["uid"], payload["role"], payload["ok"]) == (7, "learner", True)
+
+
+def test_tampered_or_expired_tokens_are_rejected(signed):
+    body, signature = issue_token(USER).split(".")
+
+    assert decode_token(body[:-2] + "xx." + signature) is None
+    assert decode_token(issue_token(USER, lifetime=-1)) is None
+
+
+def test_no_token_is_signed_in_db_mode():
+    # Forged "body.signature" cookies still go through the sessions table
+    assert not is_signed_token("body.signature")
+
+
+def test_tokens_are_never_accepted_with_an_empty_key(signed, monkeypatch):
+    token = issue_token(USER)
+    monkeypatch.setattr(session_tokens, "SESSION_SIGNING_KEY", "")
+
+    assert decode_token(token) is None
+
+
+def test_revoked_session(signed):
+    revocations = RevocationList()
+    payload = decode_token(issue_token(USER))
+
+    revocations.revoke_session(payload)
+
+    assert revocations.is_revoked(payload)
+    assert not revocations.is_revoked(decode_token(issue_token(USER)))
+
+
+def test_user_revocation_spares_tokens_issued_after_it_in_the_same_second(signed):
+    revocations = RevocationList()
+    before = decode_token(issue_token(USER))
+    revocations.revoke_user(USER["id"])
+    after = decode_token(issue_token(USER))
+
+    assert revocations.is_revoked(before)
+    assert not revocations.is_revoked(after)
+
+
+def test_refresh_merges_stored_revocations_with_local_ones(signed):
+    stored = decode_token(issue_token(USER))
+    local = decode_token(issue_token(USER))
+    revocations = RevocationList(lambda: [{"session_id": stored["sid"], "expires_at": stored["exp"]}])
+    revocations.revoke_session(local)
+
+    revocations.refresh()
+
+    assert revocations.is_revoked(stored) and revocations.is_revoked(local)
+
+
+def test_stale_list_refreshes_without_blocking_the_caller(signed):
+    release = threading.Event()
+    loaded = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        loaded.set()
+        return []
+
+    revocations = RevocationList(slow_loader, refresh_interval=0)
+    payload = decode_token(issue_token(USER))
+
+    started = time.perf_counter()
+    assert not revocations.is_revoked(payload)
+    assert time.perf_counter() - started < 1
+
+    release.set()
+    assert loaded.wait(5)
@@ -24,26 +24,24 @@ export default function LearnerHome() {
 
   const fetchDashboardData = async () => {
     try {
-      // Fetch profile
-      const profileRes = await fetch('/api/learner/profile', { credentials: 'include' });
-      const profileData = await profileRes.json();
+      // Profile and enrolled courses in one call, alongside the catalog for recommendations
+      const [dashboardRes, recRes] = await Promise.all([
+        fetch('/api/learner/dashboard', { credentials: 'include' }),
+        fetch('/api/learner/courses', { credentials: 'include' })
+      ]);
+      const dashboard = await dashboardRes.json();
       
       setStats({
-        courses: profileData.profile?.total_courses || 0,
+        courses: dashboard.profile?.total_courses || 0,
         progress: 0,
-        points: profileData.profile?.total_points || 0,
-        badge: profileData.profile?.badge_level || 'Newbie',
-        completed: profileData.profile?.completed_courses || 0,
-        inProgress: profileData.profile?.in_progress_courses || 0
+        points: dashboard.profile?.total_points || 0,
+        badge: dashboard.profile?.badge_level || 'Newbie',
+        completed: dashboard.profile?.completed_courses || 0,
+        inProgress: dashboard.profile?.in_progress_courses || 0
       });
 
-      // Fetch my courses
-      const coursesRes = await fetch('/api/learner/my-courses', { credentials: 'include' });
-      const coursesData = await coursesRes.json();
-      setRecentCourses((coursesData.courses || []).slice(0, 3));
+      setRecentCourses((dashboard.courses || []).slice(0, 3));
 
-      // Fetch recommended courses
-      const recRes = await fetch('/api/learner/courses', { credentials: 'include' });
       const recData = await recRes.json();
       setRecommendedCourses((recData.courses || []).filter(c => !c.enrolled).slice(0, 6));
     } catch (error) {
@@ -12,6 +12,8 @@ export default function LessonPlayer() {
   const [currentLesson, setCurrentLesson] = useState(null);
   const [lessons, setLessons] = useState([]);
   const [attachments, setAttachments] = useState([]);
+  const [access, setAccess] = useState({ has_access: true });
+  const [resumePosition, setResumePosition] = useState(0);
   const [progress, setProgress] = useState({});
   const [sidebarOpen, setSidebarOpen] = useState(true);
   const [loading, setLoading] = useState(true);
@@ -23,54 +25,49 @@ export default function LessonPlayer() {
   const navigate = useNavigate();
 
   useEffect(() => {
-    fetchCourseData();
-    fetchLessonData();
-    markLessonStarted();
+    bootstrapLesson();
   }, [lessonId]);
 
-  const fetchCourseData = async () => {
-    try {
-      const response = await fetch(`/api/learner/courses/${courseId}`, { credentials: 'include' });
-      const data = await response.json();
-      setCourse(data.course);
-      setLessons(data.course.lessons || []);
-      
-      // Build progress map
-      const progressMap = {};
-      (data.course.completed_lessons || []).forEach(lid => {
-        progressMap[lid] = 'completed';
-      });
-      setProgress(progressMap);
-    } catch (error) {
-      console.error('Error fetching course:', error);
-    }
+  const applyCourse = (courseData) => {
+    setCourse(courseData);
+    setLessons(courseData.lessons || []);
+    
+    // Build progress map
+    const progressMap = {};
+    (courseData.completed_lessons || []).forEach(lid => {
+      progressMap[lid] = 'completed';
+    });
+    setProgress(progressMap);
   };
 
-  const fetchLessonData = async () => {
+  // Course outline, lesson, attachments and progress in one request; also records the lesson start
+  const bootstrapLesson = async () => {
     try {
-      const response = await fetch(`/api/lessons/${lessonId}`, { credentials: 'include' });
+      const response = await fetch(`/api/learner/lessons/${lessonId}/bootstrap`, {
+        method: 'POST',
+        credentials: 'include'
+      });
       const data = await response.json();
+      applyCourse(data.course);
       setCurrentLesson(data.lesson);
-      
-      // Fetch attachments
-      const attachRes = await fetch(`/api/lessons/${lessonId}/attachments`);
-      const attachData = await attachRes.json();
-      setAttachments(attachData.attachments || []);
+      setAttachments(data.attachments || []);
+      // Without access the lesson is only its outline entry: show why instead of the content
+      setAccess(data.access || { has_access: true });
+      setResumePosition(data.resume_position || 0);
     } catch (error) {
-      console.error('Error fetching lesson:', error);
+      console.error('Error loading lesson:', error);
     } finally {
       setLoading(false);
     }
   };
 
-  const markLessonStarted = async () => {
+  const fetchCourseData = async () => {
     try {
-      await fetch(`/api/learner/lessons/${lessonId}/start`, {
-        method: 'POST',
-        credentials: 'include'
-      });
+      const response = await fetch(`/api/learner/courses/${courseId}`, { credentials: 'include' });
+      const data = await response.json();
+      applyCourse(data.course);
     } catch (error) {
-      console.error('Error marking lesson started:', error);
+      console.error('Error fetching course:', error);
     }
   };
 
@@ -355,16 +352,42 @@ export default function LessonPlayer() {
     return 'locked';
   };
 
+  const LOCKED_MESSAGES = {
+    login_required: 'Log in to open this lesson.',
+    not_enrolled: 'Enroll in this course to open its lessons.',
+    payment_required: 'Complete the payment for this course to open its lessons.',
+    invitation_required: 'This course is by invitation only.'
+  };
+
+  // Resume a video where the learner left it (YouTube embeds take the start in seconds)
+  const videoSrc = (url) => {
+    const src = url.replace('watch?v=', 'embed/');
+    if (!resumePosition) return src;
+    return `${src}${src.includes('?') ? '&' : '?'}start=${Math.floor(resumePosition)}`;
+  };
+
   const renderContent = () => {
     if (!currentLesson) return null;
 
+    if (!access.has_access) {
+      return (
+        <div className="quiz-intro">
+          <h2><Lock size={24} /> Lesson locked</h2>
+          <p>{LOCKED_MESSAGES[access.reason] || 'You do not have access to this lesson.'}</p>
+          <button className="btn btn-primary" onClick={() => navigate(`/courses/${courseId}`)}>
+            Go to Course
+          </button>
+        </div>
+      );
+    }
+
     switch (currentLesson.content_type) {
       case 'video':
         return (
           <div className="video-container">
             {currentLesson.video_url ? (
               <iframe
-                src={currentLesson.video_url.replace('watch?v=', 'embed/')}
+                src={videoSrc(currentLesson.video_url)}
                 title={currentLesson.title}
                 frameBorder="0"
                 allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture"
@@ -520,7 +543,7 @@ export default function LessonPlayer() {
           <button
             className="btn btn-success"
             onClick={markLessonCompleted}
-            disabled={progress[lessonId] === 'completed'}
+            disabled={progress[lessonId] === 'completed' || !access.has_access}
           >
             {progress[lessonId] === 'completed' ? '✓ Completed' : 'Mark as Complete'}
           </button>